@@ -0,0 +1,97 @@
+# benchmarks/import_budget.py
+"""
+导入开销检查：在全新的子进程中导入模拟相关模块，检查
+1. networkx / pandas / matplotlib / scipy 没有在导入时被加载（应在用到时才导入）
+2. 导入耗时（扣除 numpy 本身的导入时间）不超过预算
+进程池的工作进程每次启动都要付出这部分开销。
+
+耗时取多次测量的最小值；各模块按轮交替测量，同一模块的几次测量在时间上错开，
+超出预算的模块再按轮补测最多 --confirm 轮，避免机器负载高峰（曾在空闲时 75 ms 的模块上测得 255 ms）
+造成误报。重量级依赖的导入由第 1 项直接检查，预算只需拦住数量级的退化。
+
+用法（在项目根目录运行）:
+    python benchmarks/import_budget.py [--budget-ms 200] [--repeats 7] [--confirm 3]
+不满足条件时以非零状态码退出。
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODULES = ['src.consensus_simulator', 'src.sweep', 'src.result_cache', 'src.topology_cache']
+HEAVY_MODULES = ['networkx', 'pandas', 'matplotlib', 'scipy']
+
+PROBE = """
+import json, sys, time
+t0 = time.perf_counter()
+import numpy
+t1 = time.perf_counter()
+import {module}
+t2 = time.perf_counter()
+heavy = sorted({{name.split('.')[0] for name in sys.modules}} & set({heavy!r}))
+print(json.dumps({{'numpy_ms': (t1 - t0) * 1000, 'module_ms': (t2 - t1) * 1000, 'heavy': heavy}}))
+"""
+
+
+def probe(module):
+    """在全新解释器中导入 module 一次，返回 (耗时, 导入时加载的重量级依赖)"""
+    output = subprocess.run(
+        [sys.executable, '-c', PROBE.format(module=module, heavy=HEAVY_MODULES)],
+        cwd=PROJECT_ROOT, capture_output=True, text=True, check=True
+    ).stdout
+    result = json.loads(output.strip().splitlines()[-1])
+    return result['module_ms'], result['heavy']
+
+
+def measure(modules, repeats, best=None):
+    """
+    按轮交替测量各模块（每轮每个模块一次，共 repeats 轮），返回 {模块: (最短耗时, 重量级依赖)}。
+    best 为此前的测量结果时在其基础上继续取最小值。
+    """
+    best = dict(best or {})
+    for _ in range(repeats):
+        for module in modules:
+            elapsed, heavy = probe(module)
+            previous = best.get(module)
+            if previous is not None:
+                elapsed = min(elapsed, previous[0])
+            best[module] = (elapsed, heavy)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="检查 src 模块的导入开销")
+    parser.add_argument('--budget-ms', type=float, default=200.0,
+                        help="单个模块导入耗时上限（毫秒，不含 numpy）")
+    parser.add_argument('--repeats', type=int, default=7, help="每个模块的测量次数（取最小值）")
+    parser.add_argument('--confirm', type=int, default=3, help="超出预算的模块最多补测的轮数")
+    args = parser.parse_args()
+
+    results = measure(MODULES, args.repeats)
+    for _ in range(args.confirm):
+        over = [module for module in MODULES if results[module][0] > args.budget_ms]
+        if not over:
+            break
+        time.sleep(1.0)  # 与上一轮错开，避开短时的负载高峰
+        results = measure(over, args.repeats, results)
+
+    failed = False
+    for module in MODULES:
+        elapsed, heavy = results[module]
+        problems = []
+        if heavy:
+            problems.append(f"导入时加载了 {', '.join(heavy)}")
+        if elapsed > args.budget_ms:
+            problems.append(f"超出预算 {args.budget_ms:.0f} ms")
+        status = '❌ ' + '；'.join(problems) if problems else '✅'
+        print(f"{module:28} {elapsed:8.1f} ms  {status}")
+        failed = failed or bool(problems)
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,255 @@
+# benchmarks/run_benchmarks.py
+"""
+模拟器性能基准：规模 × 拓扑 × 策略 × 噪声 的全组合，每个组合记录
+- time_per_iter: 每轮迭代的墙钟时间（秒）。每组计时至少持续 --min-block-time 秒（轮数先倍增校准），
+  重复 --repeats 组，取各组平均值的最小值以抑制机器抖动
+- build_time: 构建模拟器（拓扑 + 智能体初始化）的时间
+- peak_mem_mb: 构建与前几轮迭代期间的 Python/numpy 内存峰值（tracemalloc）
+- iterations: 收敛所需轮数（仅 N <= --convergence-max-n 时测量，否则为 null）
+
+用法（在项目根目录运行）:
+    python benchmarks/run_benchmarks.py                         # 快速档：N = 10 … 10^4
+    python benchmarks/run_benchmarks.py --full                  # 完整档：N = 10 … 10^6
+    python benchmarks/run_benchmarks.py --save-baseline benchmarks/baselines/main.json
+    python benchmarks/run_benchmarks.py --baseline benchmarks/baselines/main.json --threshold 0.2
+与基线比较时，耗时或内存超出基线 threshold 比例且绝对增量超过噪声下限（--min-abs-time 秒/轮、
+--min-abs-mem MB）、或收敛轮数增加的组合被标记为回归。耗时超标的组合最多按轮重新测量 --confirm 次并取最小值，
+仍超标才计为回归（排除持续数秒的机器负载波动），存在回归时以非零状态码退出。
+基线与机器相关，请在同一台机器上生成和比较。
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+from src.consensus_simulator import ConsensusSimulator  # noqa: E402
+from src.implicit_topology import IMPLICIT_TOPOLOGIES  # noqa: E402
+from src.topology_cache import configure_topology_cache  # noqa: E402
+from src.strategies import (  # noqa: E402
+    DeGrootStrategy, StubbornStrategy, SusceptibleStrategy, AdaptiveSusceptibleStrategy,
+    DiffAdaptiveStrategy, RobustDiffAdaptiveStrategy, NoiseResilientStrategy,
+    LowPassFilterStrategy,
+)
+
+QUICK_SIZES = [10, 100, 1000, 10000]
+FULL_SIZES = [10, 100, 1000, 10000, 100000, 1000000]
+TOPOLOGIES = ['complete', 'ring', 'star', 'small_world']
+NOISE_LEVELS = [0.0, 0.01]
+TIMING_REPEATS = 7
+MIN_BLOCK_TIME = 0.05  # 秒
+WARMUP_ITERATIONS = 3
+MIN_ABS_TIME = 1e-5  # 秒/轮：低于该绝对增量的耗时变化视为计时噪声
+MIN_ABS_MEM = 0.5  # MB
+# 与实验脚本一致：所有智能体共享同一个策略实例
+STRATEGIES = {
+    'deGroot': DeGrootStrategy,
+    'stubborn': lambda: StubbornStrategy(alpha=0.7),
+    'susceptible': lambda: SusceptibleStrategy(beta=2.0),
+    'adaptive_susceptible': AdaptiveSusceptibleStrategy,
+    'diff_adaptive': lambda: DiffAdaptiveStrategy(beta_max=0.7, k=0.05),
+    'robust_diff_adaptive': lambda: RobustDiffAdaptiveStrategy(beta_max=0.7, k=0.05, tau=30),
+    'noise_resilient': NoiseResilientStrategy,
+    'lowpass_filter': lambda: LowPassFilterStrategy(alpha=0.9, beta_max=0.6, k=0.05, tau=50),
+}
+
+
+def cell_id(n, topology, strategy, noise_std):
+    return f"{topology}/{strategy}/N={n}/noise={noise_std:g}"
+
+
+def build_simulator(n, topology, strategy):
+    """全连接与星型使用隐式引擎（显式全连接在大规模下需要 O(n²) 边表）"""
+    engine = 'implicit' if topology in IMPLICIT_TOPOLOGIES else 'auto'
+    sim = ConsensusSimulator(n, topology=topology, initial_state_range=(0, 100), verbose=False,
+                             engine=engine, history='none', seed=42)
+    shared = STRATEGIES[strategy]()
+    sim.set_strategy(shared)
+    return sim
+
+
+def calibrate_block(sim, noise_std, min_block_time):
+    """
+    每组计时的轮数：先预热若干轮（首轮含延迟初始化，可能比稳态慢上千倍，不能参与校准），
+    再从 1 轮开始倍增，直到一组耗时不少于 min_block_time。
+    """
+    for _ in range(WARMUP_ITERATIONS):
+        sim.run_iteration(noise_std=noise_std)
+    per_block = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(per_block):
+            sim.run_iteration(noise_std=noise_std)
+        if time.perf_counter() - start >= min_block_time:
+            return per_block
+        per_block *= 2
+
+
+def time_per_iteration(sim, noise_std, repeats=TIMING_REPEATS, min_block_time=MIN_BLOCK_TIME):
+    """每轮耗时：repeats 组、每组至少 min_block_time 秒，取各组平均值的最小值"""
+    per_block = calibrate_block(sim, noise_std, min_block_time)
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for _ in range(per_block):
+            sim.run_iteration(noise_std=noise_std)
+        samples.append((time.perf_counter() - start) / per_block)
+    return min(samples)
+
+
+def run_cell(n, topology, strategy, noise_std, convergence_max_n, max_iterations,
+             repeats=TIMING_REPEATS, min_block_time=MIN_BLOCK_TIME):
+    configure_topology_cache()  # 每个组合重新生成拓扑，构建时间与内存不受前一个组合影响
+
+    # 内存峰值单独测量：tracemalloc 会显著拖慢分配密集的构建过程，不能与计时混在一起
+    tracemalloc.start()
+    sim = build_simulator(n, topology, strategy)
+    for _ in range(3):
+        sim.run_iteration(noise_std=noise_std)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del sim
+
+    configure_topology_cache()
+    start = time.perf_counter()
+    sim = build_simulator(n, topology, strategy)
+    build_time = time.perf_counter() - start
+
+    time_per_iter = time_per_iteration(sim, noise_std, repeats, min_block_time)
+
+    iterations = None
+    if n <= convergence_max_n:
+        sim = build_simulator(n, topology, strategy)
+        iterations = sim.run_until_convergence(max_iterations=max_iterations, tolerance=1e-6,
+                                               noise_std=noise_std, verbose=False)
+
+    return {
+        'n': n, 'topology': topology, 'strategy': strategy, 'noise_std': noise_std,
+        'engine': sim.engine,
+        'time_per_iter': time_per_iter,
+        'build_time': build_time,
+        'peak_mem_mb': peak / 1024 ** 2,
+        'iterations': iterations,
+    }
+
+
+def compare(results, baseline, threshold, min_abs_time=MIN_ABS_TIME, min_abs_mem=MIN_ABS_MEM):
+    """
+    与基线逐项比较，返回 (回归列表, 改进列表)，每项为 (组合, 说明)。
+    相对变化超过 threshold 且绝对变化超过噪声下限（耗时 min_abs_time 秒/轮，内存 min_abs_mem MB）才计入，
+    避免微秒级的计时抖动触发相对阈值。
+    """
+    regressions, improvements = [], []
+    floors = {'time_per_iter': min_abs_time, 'peak_mem_mb': min_abs_mem}
+    for key, current in results.items():
+        reference = baseline.get(key)
+        if reference is None:
+            continue
+        for metric, floor in floors.items():
+            old, new = reference[metric], current[metric]
+            if old <= 0 or abs(new - old) <= floor:
+                continue
+            ratio = new / old
+            if ratio > 1 + threshold:
+                regressions.append((key, f"{key}: {metric} {old:.4g} → {new:.4g} (×{ratio:.2f})"))
+            elif ratio < 1 / (1 + threshold):
+                improvements.append((key, f"{key}: {metric} {old:.4g} → {new:.4g} (×{ratio:.2f})"))
+        old_iter, new_iter = reference.get('iterations'), current.get('iterations')
+        if old_iter is not None and new_iter is not None and new_iter > old_iter:
+            regressions.append((key, f"{key}: iterations {old_iter} → {new_iter}"))
+    return regressions, improvements
+
+
+def main():
+    parser = argparse.ArgumentParser(description="共识模拟器性能基准")
+    parser.add_argument('--full', action='store_true', help="测试到 N = 10^6（默认只到 10^4）")
+    parser.add_argument('--sizes', type=int, nargs='+', help="自定义规模列表")
+    parser.add_argument('--topologies', nargs='+', default=TOPOLOGIES, choices=TOPOLOGIES)
+    parser.add_argument('--strategies', nargs='+', default=list(STRATEGIES), choices=list(STRATEGIES))
+    parser.add_argument('--noise', type=float, nargs='+', default=NOISE_LEVELS)
+    parser.add_argument('--convergence-max-n', type=int, default=10000,
+                        help="只对不超过该规模的组合测量收敛轮数")
+    parser.add_argument('--max-iterations', type=int, default=2000, help="收敛测量的最大轮数")
+    parser.add_argument('--output', help="把本次结果写入该 JSON 文件")
+    parser.add_argument('--save-baseline', help="把本次结果保存为基线")
+    parser.add_argument('--baseline', help="与该基线比较并标记回归")
+    parser.add_argument('--threshold', type=float, default=0.2, help="回归阈值（相对变化比例）")
+    parser.add_argument('--min-abs-time', type=float, default=MIN_ABS_TIME,
+                        help="耗时回归的绝对噪声下限（秒/轮）")
+    parser.add_argument('--min-abs-mem', type=float, default=MIN_ABS_MEM, help="内存回归的绝对噪声下限（MB）")
+    parser.add_argument('--repeats', type=int, default=TIMING_REPEATS, help="每个组合的计时组数")
+    parser.add_argument('--min-block-time', type=float, default=MIN_BLOCK_TIME,
+                        help="每组计时的最短持续时间（秒）")
+    parser.add_argument('--confirm', type=int, default=3, help="超出阈值的组合最多重新测量的轮数")
+    args = parser.parse_args()
+
+    sizes = args.sizes or (FULL_SIZES if args.full else QUICK_SIZES)
+    # 预热：每种拓扑先跑一个不计入结果的最小组合，使延迟导入等一次性开销不落在第一个组合的耗时与内存峰值里
+    for topology in args.topologies:
+        run_cell(min(sizes), topology, args.strategies[0], args.noise[-1], -1, args.max_iterations, 1, 0.0)
+    results = {}
+    for n in sizes:
+        for topology in args.topologies:
+            for strategy in args.strategies:
+                for noise_std in args.noise:
+                    key = cell_id(n, topology, strategy, noise_std)
+                    result = run_cell(n, topology, strategy, noise_std,
+                                      args.convergence_max_n, args.max_iterations,
+                                      args.repeats, args.min_block_time)
+                    results[key] = result
+                    iterations = result['iterations'] if result['iterations'] is not None else '-'
+                    print(f"{key:52} {result['time_per_iter'] * 1000:10.3f} ms/轮  "
+                          f"构建 {result['build_time']:7.3f} s  "
+                          f"峰值 {result['peak_mem_mb']:9.1f} MB  轮数 {iterations}")
+
+    payload = {
+        'meta': {'python': platform.python_version(), 'numpy': np.__version__,
+                 'machine': platform.machine(), 'processor': platform.processor(),
+                 'created': time.strftime('%Y-%m-%d %H:%M:%S')},
+        'results': results,
+    }
+    for path in (args.output, args.save_baseline):
+        if path:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(payload, f, ensure_ascii=False, indent=2)
+            print(f"✅ 结果已保存至: {path}")
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)['results']
+        regressions, improvements = compare(results, baseline, args.threshold,
+                                            args.min_abs_time, args.min_abs_mem)
+        for round_index in range(args.confirm):
+            # 按轮重测全部可疑组合，同一组合的几次重测在时间上错开，不会落在同一段负载高峰里
+            suspects = sorted({key for key, _ in regressions})
+            if not suspects:
+                break
+            print(f"🔁 第 {round_index + 1} 轮重新测量 {len(suspects)} 个超出阈值的组合")
+            for key in suspects:
+                result = results[key]
+                retry = run_cell(result['n'], result['topology'], result['strategy'], result['noise_std'],
+                                 -1, args.max_iterations, args.repeats, args.min_block_time)
+                result['time_per_iter'] = min(result['time_per_iter'], retry['time_per_iter'])
+                result['peak_mem_mb'] = min(result['peak_mem_mb'], retry['peak_mem_mb'])
+            regressions, improvements = compare(results, baseline, args.threshold,
+                                                args.min_abs_time, args.min_abs_mem)
+        for _, line in improvements:
+            print(f"⬆️ 改进 {line}")
+        for _, line in regressions:
+            print(f"❌ 回归 {line}")
+        if regressions:
+            print(f"\n⚠️ {len(regressions)} 项超出阈值 {args.threshold:.0%}")
+            sys.exit(1)
+        print("\n✅ 未发现回归")
+
+
+if __name__ == '__main__':
+    main()
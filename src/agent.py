@@ -1,5 +1,19 @@
 # src/agent.py
 from .strategies import DeGrootStrategy, StubbornStrategy, SusceptibleStrategy
+from .implicit_topology import CompleteNeighbors
+
+
+def create_strategy(strategy_type, params):
+    """按名称创建共识策略对象"""
+    if strategy_type == 'deGroot':
+        return DeGrootStrategy(**params)
+    elif strategy_type == 'stubborn':
+        return StubbornStrategy(**params)
+    elif strategy_type == 'susceptible':
+        return SusceptibleStrategy(**params)
+    else:
+        raise ValueError(f"未知的策略类型: {strategy_type}")
+
 
 class Agent:
     def __init__(self, agent_id, initial_state, neighbors=None, strategy='deGroot', **strategy_params):
@@ -9,7 +23,7 @@ class Agent:
             agent_id: 智能体唯一标识
             initial_state: 初始状态值
             neighbors: 邻居ID列表
-            strategy: 共识策略类型，可选 'deGroot', 'stubborn', 'susceptible'
+            strategy: 共识策略类型，可选 'deGroot', 'stubborn', 'susceptible'；也可直接传入策略对象
             strategy_params: 策略特定参数，如alpha、beta等
         """
         self.id = agent_id
@@ -19,22 +33,20 @@ class Agent:
         # 设置邻居
         if neighbors is None:
             self.neighbors = []
+        elif isinstance(neighbors, CompleteNeighbors):
+            self.neighbors = neighbors  # 隐式全连接邻居序列，不展开为 O(n) 列表
         else:
             self.neighbors = list(neighbors)  # 确保是列表
         
         # 初始化策略
-        self.strategy = self._create_strategy(strategy, strategy_params)
-    
+        if isinstance(strategy, str):
+            self.strategy = self._create_strategy(strategy, strategy_params)
+        else:
+            self.strategy = strategy
+
     def _create_strategy(self, strategy_type, params):
         """创建共识策略对象"""
-        if strategy_type == 'deGroot':
-            return DeGrootStrategy(**params)
-        elif strategy_type == 'stubborn':
-            return StubbornStrategy(**params)
-        elif strategy_type == 'susceptible':
-            return SusceptibleStrategy(**params)
-        else:
-            raise ValueError(f"未知的策略类型: {strategy_type}")
+        return create_strategy(strategy_type, params)
     
     def compute_next_state(self, neighbor_states):
         """
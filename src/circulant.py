@@ -0,0 +1,78 @@
+# src/circulant.py
+"""
+循环矩阵快速路径：
+环形 / k-正则格子上所有个体使用相同线性权重时，W 是循环矩阵
+(W x)_i = Σ_d w[d] x_{(i+d) mod N}，被离散傅里叶变换对角化，特征值即核的 FFT：
+    λ_k = Σ_d w[d] e^{2πi dk/N}（拓扑无向时 w 对称，λ_k 为实数）
+因此 W^t x = IFFT(λ^t · FFT(x))：任意轮数只需一对 FFT，O(N log N) 与 t 无关，
+并且得到完整的谱。
+"""
+import numpy as np
+
+
+class CirculantUpdate:
+    """
+    循环线性更新。
+    参数:
+        kernel (np.ndarray): 长度为 N 的核，kernel[d] 为个体 i 对 i+d 号个体（模 N）的权重。
+    """
+    def __init__(self, kernel):
+        self.kernel = np.asarray(kernel, dtype=float)
+        self.n_agents = len(self.kernel)
+        # (W x)_i = Σ_d w[d] x_{i+d} 是与翻转核的循环卷积
+        self._spectrum = np.fft.rfft(np.roll(self.kernel[::-1], 1))
+        self._real = np.allclose(self.kernel, np.roll(self.kernel[::-1], 1))
+        if self._real:
+            self._spectrum = self._spectrum.real
+
+    @classmethod
+    def from_update(cls, update):
+        """
+        由 spectral.LinearUpdate 检测循环结构：所有个体权重相同，且每一行的邻居偏移量
+        (j - i) mod N 与权重都相同。不是循环矩阵时返回 None。
+        """
+        adjacency = getattr(update.engine, 'adjacency', None)
+        n = update.n_agents
+        if adjacency is None or n < 2:
+            return None
+        if np.ptp(update.self_weight) != 0 or np.ptp(update.neighbor_weight) != 0:
+            return None
+        degree = np.diff(adjacency.indptr)
+        if np.ptp(degree) != 0:
+            return None
+        rows = np.repeat(np.arange(n), degree)
+        offsets = ((adjacency.indices - rows) % n).reshape(n, degree[0])
+        weights = np.asarray(adjacency.data, dtype=float).reshape(n, degree[0])
+        order = np.argsort(offsets, axis=1, kind='stable')
+        offsets = np.take_along_axis(offsets, order, axis=1)
+        weights = np.take_along_axis(weights, order, axis=1)
+        if not (np.all(offsets == offsets[0]) and np.all(weights == weights[0])):
+            return None
+        kernel = np.zeros(n)
+        np.add.at(kernel, offsets[0], update.neighbor_weight[0] * weights[0])
+        kernel[0] += update.self_weight[0]
+        return cls(kernel)
+
+    def eigenvalues(self):
+        """W 的全部 N 个特征值（频率 k = 0 … N-1 的顺序）"""
+        if self._real:
+            return np.concatenate([self._spectrum, self._spectrum[1:(self.n_agents + 1) // 2][::-1]])
+        return np.fft.fft(np.roll(self.kernel[::-1], 1))
+
+    def extremes(self):
+        """(λ_2, λ_min)：去掉共识模态 k = 0 后的最大与最小特征值（要求谱为实数）"""
+        if not self._real:
+            raise ValueError("核不对称，循环矩阵的谱不是实数")
+        rest = self._spectrum[1:]
+        return float(rest.max()), float(rest.min())
+
+    def apply(self, x, t=1):
+        """计算 W^t x（x 可为 N 维向量或 N×K 矩阵），一对 FFT，与 t 无关"""
+        t = int(t)
+        if t < 0:
+            raise ValueError("t 必须 >= 0")
+        x = np.asarray(x, dtype=float)
+        if t == 0:
+            return x.copy()
+        factor = (self._spectrum ** t).reshape((-1,) + (1,) * (x.ndim - 1))
+        return np.fft.irfft(factor * np.fft.rfft(x, axis=0), n=self.n_agents, axis=0)
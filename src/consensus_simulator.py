@@ -1,88 +1,350 @@
 # src/consensus_simulator.py
 
+import time
+from contextlib import nullcontext
+
 import numpy as np
-from .network_generator import generate_topology, get_adjacency_list  # ← 修正导入
-from .agent import Agent  # ← 注意：你的文件叫 agent.py，不是 agents.py
+from .network_generator import csr_to_graph, generate_topology  # ← 修正导入
+from .topology_cache import get_topology
+from .agent import Agent, create_strategy  # ← 注意：你的文件叫 agent.py，不是 agents.py
+from .sparse_engine import SparseEngine
+from .implicit_topology import IMPLICIT_TOPOLOGIES, ImplicitAdjacency, make_implicit_engine
+from .strategy_state import StrategyStateStore
+from .state_history import StateHistory
+from .recorders import SUMMARY_RECORDERS
+from .rng import as_seed_sequence, derive_int_seed, initial_state_rng, make_rng
+from .noise import NOISE_MODELS, NoiseSource
+from .instrumentation import make_instrumentation
 
 class ConsensusSimulator:
     def __init__(self, n_agents, topology='complete', initial_state_range=(0, 1), 
-                 strategy='deGroot', strategy_params=None, max_iterations=1000, verbose=True):
+                 strategy='deGroot', strategy_params=None, max_iterations=1000, verbose=True, engine='auto',
+                 record_every=1, history_dtype=np.float64, history='full', seed=42,
+                 noise_model='edge', noise_chunk=1, topology_params=None, instrument=False):
         """
         初始化共识模拟器。
         参数:
             n_agents (int): 智能体数量。
-            topology (str): 网络拓扑类型 ('complete', 'ring', 'star', 'small_world')。
+            topology (str): 网络拓扑类型 ('complete', 'ring', 'star', 'small_world', 'lattice',
+                'erdos_renyi', 'barabasi_albert')。
             initial_state_range (tuple): 初始状态范围 (min, max)。
             strategy (str): 默认策略名称（会被 agent.strategy 覆盖）。
             strategy_params (dict): 策略参数。
             max_iterations (int): 最大迭代次数。
             verbose (bool): 是否打印详细信息。
+            engine (str): 迭代引擎 ('auto', 'loop', 'sparse', 'implicit')。
+                'loop' 为逐个体循环；'sparse' 使用CSR稀疏矩阵整体更新（要求所有策略实现
+                批量接口 compute_next_states）；'auto' 在策略受支持时使用稀疏引擎，否则回退到循环；
+                'implicit' 仅用于 'complete' / 'star'，不构建任何边表，每轮 O(n)。
+            record_every (int): 每隔多少轮记录一次完整状态（初始与最终状态总会记录）。
+            history_dtype: 状态历史的存储精度（如 np.float32 可减半内存）。
+            history (str): 历史记录方式 ('full', 'summary', 'none')。
+                'full' 记录完整状态；'summary' 只挂载内置摘要记录器（均值/标准差/最小/最大/极差/
+                分歧能量）；'none' 不记录逐轮信息。后两者的 state_history 仅保存初始与每次运行结束时的状态。
+            seed: 随机种子（None / 整数 / SeedSequence / Generator）。模拟器持有独立的随机数流，
+                不修改全局 np.random；传入 None 则每个实例使用不同的随机数流。
+                整数种子的初始状态由 np.random.RandomState(seed) 抽取，与旧版 np.random.seed(42) 的
+                初始状态逐位相同（默认 42），因此确定性拓扑上的无噪声结果与旧版一致；
+                拓扑与通信噪声各用一个由种子派生的 Generator，带噪声运行与 small_world 等随机拓扑
+                不再复现旧版（旧版两者取自全局随机状态，本身也不可复现）。
+            noise_model (str): 通信噪声模型 ('edge', 'sender')。
+                'edge' 每条有向边独立抽取噪声（每个接收方收到的值各不相同）；
+                'sender' 每个智能体每轮只抽取一个噪声，其全部邻居收到同一个带噪声的状态。
+            noise_chunk (int): 噪声按块预生成的轮数。整条边集的噪声每轮一次性抽取，
+                noise_chunk > 1 时一次抽取多轮（内存为 noise_chunk 倍单轮噪声）；
+                形状不变时随机数序列与逐轮抽取完全相同。
+            topology_params (dict): 拓扑参数（如 small_world 的 k、p）。拓扑经进程级缓存获取，
+                相同参数与种子的拓扑只生成一次（见 topology_cache）。
+            instrument: 性能统计（见 src/instrumentation.py）。False 不统计（无额外开销）；
+                True 在内存中统计各阶段耗时（拓扑构建、智能体初始化、每轮计算、收敛判定、历史记录），
+                通过 stats 查看；传入字符串时同时把事件写入该 JSONL 文件（每次 run_until_convergence /
+                run_ensemble 结束时落盘并关闭文件）；也可传入 Instrumentation 实例。
         """
+        if noise_model not in NOISE_MODELS:
+            raise ValueError(f"未知的噪声模型: {noise_model}")
+        if history not in ('full', 'summary', 'none'):
+            raise ValueError(f"未知的历史记录方式: {history}")
+        if engine not in ('auto', 'loop', 'sparse', 'implicit'):
+            raise ValueError(f"未知的迭代引擎: {engine}")
+        if engine == 'implicit' and topology not in IMPLICIT_TOPOLOGIES:
+            raise ValueError(f"隐式引擎仅支持 {IMPLICIT_TOPOLOGIES} 拓扑")
+        self.instrumentation = make_instrumentation(instrument)
+        instr = self.instrumentation
         self.n_agents = n_agents
         self.topology = topology
+        self.topology_params = dict(topology_params or {})
         self.initial_state_range = initial_state_range
         self.max_iterations = max_iterations
         self.verbose = verbose
-        self.state_history = []
+        self.engine = engine
+        self.history = history
+        self.recorders = {}
+        self._batch_engine = None
+        self._step = 0  # 已执行的迭代轮数（传给策略批量接口）
+        self._accelerator = None  # Chebyshev 加速（enable_acceleration 启用）
+        # 策略批量接口的逐个体内部状态（步数、EMA、历史等）
+        self.strategy_state = StrategyStateStore((n_agents,))
+
+        # 0. 随机数流：拓扑与噪声各用一个派生流；整数种子的初始状态直接取自 RandomState(seed)
+        if isinstance(seed, np.random.Generator):
+            self._seed_sequence = None
+            self.rng = seed
+            topology_seed = int(seed.integers(2**32))
+        else:
+            self._seed_sequence = as_seed_sequence(seed)
+            topology_sequence, noise_sequence = self._seed_sequence.spawn(2)
+            self.rng = make_rng(noise_sequence)
+            topology_seed = derive_int_seed(topology_sequence)
+        state_rng = initial_state_rng(seed)
+        self._topology_seed = topology_seed
+        self.noise = NoiseSource(self.rng, model=noise_model, chunk_size=noise_chunk)
 
-        # 1. 生成网络拓扑
-        self.G = generate_topology(topology, n_agents)
-        self.adj_list = get_adjacency_list(self.G)
+        # 1. 生成网络拓扑（隐式引擎不构建图与边表，按需生成邻居序列）
+        # networkx 图只在访问 G 时才构建
+        with self._phase('topology'):
+            self._G = None
+            if engine == 'implicit':
+                self._csr = None
+                self.adj_list = ImplicitAdjacency(topology, n_agents)
+            else:
+                self._csr = get_topology(topology, n_agents, seed=topology_seed, **self.topology_params)
+                self.adj_list = self._csr.adjacency_list()
+
+        # 2. 初始化智能体
+        # 隐式拓扑不构造 Agent 对象：状态保存在数组中、所有个体共用一个策略对象，
+        # 只有访问 agents 时才构造（见 agents 属性），构建与每轮迭代都是 O(n) 的数组运算
+        with self._phase('agent_init'):
+            initial_states = state_rng.uniform(initial_state_range[0], initial_state_range[1], n_agents)
+            if engine == 'implicit':
+                self._agents = None
+                self._states = initial_states.copy()
+                self._strategy = create_strategy(strategy, strategy_params or {})
+                if n_agents == 1 and verbose:
+                    print("⚠️ 警告: Agent 0 无邻居，将保持初始状态不变。")
+            else:
+                self._agents = {}
+                self._states = None
+                self._strategy = None
+                for i in range(n_agents):
+                    neighbors = self.adj_list.get(i, [])
+                    if not neighbors and verbose:
+                        print(f"⚠️ 警告: Agent {i} 无邻居，将保持初始状态不变。")
+                    self._agents[i] = Agent(
+                        agent_id=i,
+                        initial_state=initial_states[i],
+                        neighbors=neighbors,
+                        strategy=strategy,
+                        **(strategy_params or {})
+                    )
+            capacity_hint = max_iterations // record_every + 2 if history == 'full' else 2
+            self.state_history = StateHistory(n_agents, record_every=record_every, dtype=history_dtype,
+                                              capacity_hint=capacity_hint)
+            self.state_history.record(initial_states, 0)
+            if history == 'summary':
+                for recorder_cls in SUMMARY_RECORDERS:
+                    self.add_recorder(recorder_cls())
+            self._convergence_window = []
+        if instr is not None:
+            instr.event('init', n_agents=n_agents, topology=topology, engine=engine,
+                        strategy=strategy, history=history)
 
         if verbose:
             self._print_network_info()
 
-        # 2. 初始化智能体
-        self.agents = {}
-        np.random.seed(42)  # 固定种子确保可复现
-        initial_states = np.random.uniform(initial_state_range[0], initial_state_range[1], n_agents)
-        for i in range(n_agents):
-            neighbors = self.adj_list.get(i, [])
-            if not neighbors and verbose:
-                print(f"⚠️ 警告: Agent {i} 无邻居，将保持初始状态不变。")
-            self.agents[i] = Agent(
-                agent_id=i,
-                initial_state=initial_states[i],
-                neighbors=neighbors,
-                strategy=strategy,
-                **(strategy_params or {})
-            )
-        self.state_history = [initial_states.copy()]
-        self._convergence_window = []
+    @property
+    def stats(self):
+        """性能统计对象 SimulationStats（未启用 instrument 时为 None）"""
+        return self.instrumentation.stats if self.instrumentation is not None else None
+
+    @property
+    def agents(self):
+        """
+        智能体字典 {编号: Agent}。隐式拓扑下首次访问时才由状态数组构造（全部共用当前的策略对象）；
+        构造之后状态与策略以 Agent 为准，实验脚本可以像原来一样直接修改 agent.state / agent.strategy。
+        """
+        if self._agents is None:
+            states = self._states.tolist()
+            self._agents = {
+                i: Agent(agent_id=i, initial_state=states[i], neighbors=self.adj_list[i], strategy=self._strategy)
+                for i in range(self.n_agents)
+            }
+            self._states = None
+            self._strategy = None
+        return self._agents
+
+    def set_strategy(self, strategy):
+        """让全部智能体共用同一个策略对象（隐式拓扑下不会因此构造 Agent）"""
+        if self._agents is None:
+            self._strategy = strategy
+        else:
+            for agent in self._agents.values():
+                agent.strategy = strategy
+
+    def _bind_batch(self, engine):
+        """把当前策略绑定到向量化引擎；未构造 Agent 时为 O(1) 的统一绑定"""
+        if self._agents is None:
+            return engine.bind_uniform(self._strategy)
+        return engine.bind([agent.strategy for agent in self._agents.values()])
+
+    def _phase(self, name):
+        """一次性阶段（构建等）的计时上下文；未启用统计时为空上下文。逐轮热路径仍直接计时，避免上下文管理器开销"""
+        if self.instrumentation is None:
+            return nullcontext()
+        return self.instrumentation.phase(name)
 
     def _print_network_info(self):
         print(f"=== 模拟器初始化 ===")
         print(f"网络类型: {self.topology}, 智能体数: {self.n_agents}")
         for i in range(min(3, self.n_agents)):
             print(f"  节点{i}的邻居: {self.adj_list.get(i, [])}")
-        first_agent = self.agents[0]
-        print(f"策略: {first_agent.strategy.__class__.__name__}, "
-              f"参数: {getattr(first_agent.strategy, '__dict__', {})}")
-        print(f"Agent 0: 初始状态={first_agent.state:.2f}, "
-              f"邻居数={len(first_agent.neighbors)}, "
-              f"策略={first_agent.strategy.__class__.__name__}")
+        strategy = self._strategy if self._agents is None else self._agents[0].strategy
+        print(f"策略: {strategy.__class__.__name__}, "
+              f"参数: {getattr(strategy, '__dict__', {})}")
+        print(f"Agent 0: 初始状态={self._current_states()[0]:.2f}, "
+              f"邻居数={len(self.adj_list.get(0, []))}, "
+              f"策略={strategy.__class__.__name__}")
+
+    @property
+    def G(self):
+        """networkx 图（首次访问时才由CSR拓扑构建，仅用于绘图等用途；模拟本身不依赖 networkx）"""
+        if self._G is None:
+            if self._csr is not None:
+                self._G = csr_to_graph(self._csr)
+            else:
+                self._G = generate_topology(self.topology, self.n_agents, **self.topology_params)
+        return self._G
+
+    def spawn_rngs(self, n):
+        """
+        派生 n 个与本模拟器及彼此独立的 Generator（用于并行副本）。
+        以 Generator 构造的模拟器从该 Generator 派生。
+        """
+        if self._seed_sequence is None:
+            return self.rng.spawn(n)
+        return [make_rng(child) for child in self._seed_sequence.spawn(n)]
 
     def get_state_history(self):
-        return np.array(self.state_history)
+        """返回已记录状态的二维视图 (记录点数 × 智能体数)，O(1) 且不拷贝，请勿原地修改"""
+        return self.state_history.as_array()
+
+    def add_recorder(self, recorder):
+        """
+        挂载在线记录器（见 src/recorders.py），每轮迭代后以当前状态调用。
+        挂载时立即记录一次当前状态，使记录序列与迭代轮数对齐。
+        """
+        if recorder.name in self.recorders:
+            raise ValueError(f"记录器 {recorder.name} 已存在")
+        recorder.bind(self)
+        recorder.record(self._current_states(), self._step)
+        self.recorders[recorder.name] = recorder
+        return recorder
+
+    def get_summary(self):
+        """返回各记录器的逐轮摘要 {名称: 数组}"""
+        return {name: recorder.as_array() for name, recorder in self.recorders.items()}
+
+    def _flush_history(self):
+        """确保当前状态已写入历史（record_every > 1 时最终状态可能不在记录步长上）"""
+        self.state_history.record(self._current_states(), self._step, force=True)
+
+    def _get_batch_engine(self):
+        """惰性创建向量化引擎（拓扑在模拟器生命周期内不变，只需编译一次）"""
+        if self._batch_engine is None:
+            if self.engine == 'implicit':
+                self._batch_engine = make_implicit_engine(self.topology, self.n_agents)
+            else:
+                self._batch_engine = SparseEngine(self.adj_list, self.n_agents,
+                                                  topology=self._csr)
+        return self._batch_engine
+
+    def _current_states(self):
+        """当前状态（副本）：未构造 Agent 时取自状态数组，否则从各智能体收集（实验脚本可能直接修改 agent.state）"""
+        if self._agents is None:
+            return self._states.copy()
+        return np.fromiter((agent.state for agent in self._agents.values()),
+                           dtype=float, count=self.n_agents)
+
+    def _write_states(self, states):
+        """把状态写回状态数组或各智能体"""
+        if self._agents is None:
+            self._states = np.array(states, dtype=float)
+        else:
+            for agent, state in zip(self._agents.values(), np.asarray(states).tolist()):
+                agent.state = state
+
+    def _run_iteration_batch(self, engine, noise_std):
+        """向量化引擎：一次整体计算推进全部智能体"""
+        if self._agents is None:
+            # 引擎不修改输入、返回新数组，直接作为新的状态数组，不做拷贝
+            self._states = engine.step(self._states, self.strategy_state,
+                                       noise_std=noise_std, step=self._step, noise=self.noise)
+            return self._states
+        new_states = engine.step(self._current_states(), self.strategy_state,
+                                 noise_std=noise_std, step=self._step, noise=self.noise)
+        self._write_states(new_states)
+        return new_states
 
     def run_iteration(self, noise_std=0.0):
         """执行一轮共识迭代"""
+        instr = self.instrumentation
+        if instr is not None:
+            start = time.perf_counter()
+        accelerator = self._accelerator
+        if accelerator is not None:
+            previous_states = self._current_states()
+        new_states = None
+        if self.engine != 'loop':
+            engine = self._get_batch_engine()
+            if self._bind_batch(engine):
+                new_states = self._run_iteration_batch(engine, noise_std)
+            elif self.engine != 'auto':
+                raise ValueError(f"{self.engine} 引擎要求所有策略实现批量接口 compute_next_states")
+        if new_states is None:
+            new_states = self._run_iteration_loop(noise_std)
+        if accelerator is not None:
+            new_states = accelerator.step(previous_states, new_states)
+            self._write_states(new_states)
+
+        self._step += 1
+        if instr is not None:
+            computed = time.perf_counter()
+            instr.record('compute', computed - start, iteration=self._step)
+            instr.count('iterations')
+        if self.history == 'full':
+            self.state_history.record(new_states, self._step)
+        for recorder in self.recorders.values():
+            recorder.record(new_states, self._step)
+        if instr is not None:
+            instr.record('history', time.perf_counter() - computed, iteration=self._step)
+        return np.std(new_states)
+
+    def _run_iteration_loop(self, noise_std):
+        """逐个体循环：每个智能体单独调用策略的 compute_next_state"""
         new_states = []
-        current_states = {i: agent.state for i, agent in self.agents.items()}
+        current_states = [agent.state for agent in self.agents.values()]
+
+        # 通信噪声每轮一次性抽取：逐边模型按邻接表顺序覆盖全部有向边，逐发送方模型每个体一个
+        edge_noise = None
+        if noise_std > 0:
+            if self.noise.model == 'sender':
+                sender_noise = self.noise.draw(self.n_agents, noise_std).tolist()
+                current_states = [x + e for x, e in zip(current_states, sender_noise)]
+            else:
+                n_edges = sum(len(agent.neighbors) for agent in self.agents.values())
+                edge_noise = self.noise.draw(n_edges, noise_std).tolist()
+        offset = 0
 
         for agent_id, agent in self.agents.items():
             if not agent.neighbors:
                 new_states.append(agent.state)
                 continue
 
-            # 获取邻居当前状态
+            # 获取邻居当前状态（逐边模型下叠加各自的噪声）
             neighbor_states = [current_states[j] for j in agent.neighbors]
-
-            # 添加通信噪声
-            if noise_std > 0:
-                noise = np.random.normal(0, noise_std, size=len(neighbor_states))
-                neighbor_states = np.array(neighbor_states) + noise
-                neighbor_states = neighbor_states.tolist()
+            if edge_noise is not None:
+                end = offset + len(neighbor_states)
+                neighbor_states = [x + e for x, e in zip(neighbor_states, edge_noise[offset:end])]
+                offset = end
 
             # 计算下一状态
             next_state = agent.strategy.compute_next_state(agent.state, neighbor_states)
@@ -91,8 +353,7 @@ class ConsensusSimulator:
         # 统一更新
         for i, state in enumerate(new_states):
             self.agents[i].state = state
-        self.state_history.append(np.array(new_states))
-        return np.std(new_states)
+        return np.array(new_states)
 
     def _is_converged_stable(self, std_dev, tolerance=1e-6, window_size=5):
         """稳定收敛判定"""
@@ -113,13 +374,46 @@ class ConsensusSimulator:
             return (np.std(arr) / (np.mean(arr) + 1e-8)) > threshold
         return False
 
-    def run_until_convergence(self, max_iterations=1000, tolerance=1e-6, noise_std=0.0, verbose=True):
-        """运行直到收敛"""
-        initial_std = np.std(self.state_history[-1])
+    def run_until_convergence(self, max_iterations=1000, tolerance=1e-6, noise_std=0.0, verbose=True,
+                              extrapolate=None, extrapolation_window=10, stationarity=None):
+        """
+        运行直到收敛。
+        max_iterations 为 'auto' 时由谱分析预测收敛轮数并取其两倍作为上限（见 spectral.estimate_convergence；
+        仅适用于线性策略，非线性策略或无法收敛时回退到 self.max_iterations）。
+        extrapolate 为 'rre' / 'mpe' 时启用外推提前终止（仅线性策略、无噪声）：每 extrapolation_window 轮
+        由最近的轨迹外推极限（见 extrapolation.py），极限的标准差、残差与相邻两次外推的变化量都低于
+        tolerance 时把极限写回智能体并结束，返回值为实际迭代的轮数。
+        stationarity 为 True 或 StationarityDetector 时启用平稳性检测（用于有噪声的运行）：分歧过程进入
+        平稳分布后提前结束（代替震荡检测），估计的噪声底及置信区间保存在 self.noise_floor_estimate。
+        """
+        if max_iterations == 'auto':
+            max_iterations = self._auto_max_iterations(tolerance)
+        extrapolator = None
+        if extrapolate is not None:
+            if noise_std > 0:
+                raise ValueError("外推提前终止只适用于无噪声的线性迭代")
+            from .extrapolation import VectorExtrapolator
+            from .spectral import LinearUpdate
+
+            update = LinearUpdate(self)
+            extrapolator = VectorExtrapolator(extrapolation_window, extrapolate)
+            extrapolator.push(self._current_states())
+        detector = None
+        self.noise_floor_estimate = None
+        if stationarity is not None and stationarity is not False:
+            from .stationarity import StationarityDetector
+
+            detector = StationarityDetector() if stationarity is True else stationarity
+            detector.reset()
+        current_states = self._current_states()
+        initial_std = np.std(current_states)
         if verbose:
             print(f"初始标准差: {initial_std:.6f}")
-            print(f"初始平均值: {np.mean(self.state_history[-1]):.4f}")
+            print(f"初始平均值: {np.mean(current_states):.4f}")
 
+        instr = self.instrumentation
+        run_start = time.perf_counter()
+        oscillating = False
         self._convergence_window = []
         for iteration in range(max_iterations):
             std_dev = self.run_iteration(noise_std=noise_std)
@@ -128,7 +422,34 @@ class ConsensusSimulator:
                 print(f"迭代 {iteration+1}: 标准差 = {std_dev:.6f}")
 
             # 收敛判定
-            if self._is_converged_stable(std_dev, tolerance=tolerance):
+            if instr is not None:
+                check_start = time.perf_counter()
+            converged = self._is_converged_stable(std_dev, tolerance=tolerance)
+            # 加速迭代的标准差本身不单调，不做震荡检测
+            oscillating = not converged and iteration > 50 and self._accelerator is None \
+                and detector is None and self._detect_oscillation(std_dev, tolerance=tolerance)
+            estimate = detector.push(std_dev) if detector is not None and not converged else None
+            if instr is not None:
+                instr.record('convergence_check', time.perf_counter() - check_start,
+                             iteration=self._step)
+
+            if extrapolator is not None and not converged:
+                extrapolator.push(self._current_states())
+                if extrapolator.ready and (iteration + 1) % extrapolation_window == 0:
+                    limit = extrapolator.estimate(update, tolerance)
+                    if limit is not None:
+                        self._write_states(limit)
+                        self._flush_history()
+                        std_dev = np.std(limit)
+                        self._record_run_end(run_start, iteration + 1, 'extrapolated', std_dev)
+                        if verbose:
+                            print(f"✅ 外推在 {iteration+1} 轮后得到极限。残差: {extrapolator.residual:.2e}，"
+                                  f"标准差: {std_dev:.2e}")
+                        return iteration + 1
+
+            if converged:
+                self._flush_history()
+                self._record_run_end(run_start, iteration + 1, 'converged', std_dev)
                 if verbose:
                     final_val = np.mean(self.state_history[-1])
                     init_val = np.mean(self.state_history[0])
@@ -136,13 +457,217 @@ class ConsensusSimulator:
                     print(f"最终共识值: {final_val:.4f} (初始平均: {init_val:.4f})")
                 return iteration + 1
 
+            if estimate is not None:
+                self.noise_floor_estimate = estimate
+                self._flush_history()
+                self._record_run_end(run_start, iteration + 1, 'stationary', std_dev)
+                if verbose:
+                    print(f"⏹️ 第 {iteration+1} 轮后分歧已平稳（自第 {estimate.truncation} 轮起）。"
+                          f"噪声底: {estimate.std:.6f}，{estimate.confidence:.0%} 置信区间 "
+                          f"[{estimate.ci_low:.6f}, {estimate.ci_high:.6f}]")
+                return iteration + 1
+
             # 震荡检测
-            if iteration > 50 and self._detect_oscillation(std_dev, tolerance=tolerance):
+            if oscillating:
                 if verbose:
                     print(f"⚠️ 检测到状态震荡，提前终止。当前标准差: {std_dev:.6f}")
                 break
 
+        self._flush_history()
         final_std = np.std(self.state_history[-1])
+        self._record_run_end(run_start, max_iterations,
+                             'oscillation' if oscillating else 'max_iterations', final_std)
         if verbose:
             print(f"❌ 在 {max_iterations} 轮后未达成共识。最终标准差: {final_std:.6f}")
-        return max_iterations
\ No newline at end of file
+        return max_iterations
+
+    def _get_propagator(self, method='auto'):
+        """跳跃推进器（策略对象与方法不变时复用，避免重复特征分解）"""
+        from .spectral import JumpPropagator, LinearUpdate
+
+        strategies = [self._strategy] if self._agents is None else \
+            [agent.strategy for agent in self._agents.values()]
+        cached = getattr(self, '_propagator', None)
+        if cached is not None and cached[0] == method and len(cached[1]) == len(strategies) \
+                and all(a is b for a, b in zip(strategies, cached[1])):
+            return cached[2]
+        propagator = JumpPropagator(LinearUpdate(self), method=method)
+        self._propagator = (method, strategies, propagator)
+        return propagator
+
+    def _set_states(self, states):
+        """把状态写回智能体，并记录历史与摘要"""
+        self._write_states(states)
+        if self.history == 'full':
+            self.state_history.record(states, self._step, force=True)
+        for recorder in self.recorders.values():
+            recorder.record(states, self._step)
+
+    def advance_to(self, t, method='auto'):
+        """
+        跳跃推进到第 t 轮（仅线性策略、无噪声），返回该轮的状态标准差。
+        直接计算 W^(t - 当前轮数) x，不逐轮迭代（见 spectral.JumpPropagator）；
+        完整历史只记录跳跃后的状态。
+        参数:
+            t (int): 目标轮数（不小于当前轮数 self._step）。
+            method (str): 'auto' / 'eigen' / 'squaring' / 'matvec'。
+        """
+        if t < self._step:
+            raise ValueError(f"目标轮数 {t} 小于当前轮数 {self._step}")
+        propagator = self._get_propagator(method)
+        states = propagator.apply(self._current_states(), t - self._step)
+        self._step = t
+        self._set_states(states)
+        return np.std(states)
+
+    def find_convergence_time(self, tolerance=1e-6, max_iterations=None, method='auto', advance=False):
+        """
+        二分查找从当前状态出发、标准差首次低于 tolerance 的轮数（仅线性策略、无噪声），
+        只需 O(log T) 次跳跃推进。注意 run_until_convergence 还要求连续 window_size 轮低于阈值，
+        其返回值约为本结果 + window_size - 1。
+        参数:
+            max_iterations (int): 搜索上限，默认 self.max_iterations。
+            advance (bool): 为 True 时把模拟器推进到找到的轮数。
+        返回:
+            首次达到阈值所需的轮数（相对当前轮数）；上限内达不到时返回 None。
+        """
+        if max_iterations is None:
+            max_iterations = self.max_iterations
+        propagator = self._get_propagator(method)
+        hit = propagator.first_hit(self._current_states(), tolerance, max_iterations)
+        if advance and hit is not None:
+            self.advance_to(self._step + hit, method=method)
+        return hit
+
+    def enable_acceleration(self, bounds=None, margin=1e-3):
+        """
+        启用 Chebyshev 加速（仅线性策略）：之后每次 run_iteration 在基础更新之上做三项递推，
+        共识值不变而收敛轮数大幅减少（见 spectral.ChebyshevAccelerator）。
+        参数:
+            bounds (tuple): 非共识特征值区间 (λ_min, λ_2)；默认由拓扑与策略自动估计。
+            margin (float): 区间相对外扩比例。
+        返回:
+            ChebyshevAccelerator。启用后外部修改了 agent.state 时请重新启用或调用其 reset()。
+        """
+        from .spectral import ChebyshevAccelerator, LinearUpdate
+
+        if bounds is None:
+            self._accelerator = ChebyshevAccelerator.from_update(LinearUpdate(self), margin=margin)
+        else:
+            self._accelerator = ChebyshevAccelerator(*bounds, margin=margin)
+        return self._accelerator
+
+    def disable_acceleration(self):
+        """恢复基础迭代"""
+        self._accelerator = None
+
+    def solve_steady_state(self, apply=False):
+        """
+        直接求线性策略（无噪声）的稳态，不运行模拟（见 spectral.solve_steady_state）。
+        参数:
+            apply (bool): 为 True 时把稳态写回智能体（轮数不变）。
+        返回:
+            SteadyState：稳态、共识值、初始均值与残差。
+        """
+        from .spectral import solve_steady_state
+
+        result = solve_steady_state(self)
+        if apply:
+            self._set_states(result.states)
+        return result
+
+    def _auto_max_iterations(self, tolerance):
+        """由谱分析设置的最大迭代次数"""
+        from .spectral import estimate_convergence
+
+        try:
+            estimate = estimate_convergence(self, tolerance=tolerance, set_max_iterations=True)
+        except ValueError:
+            return self.max_iterations
+        if self.instrumentation is not None:
+            self.instrumentation.event('auto_max_iterations', slem=estimate.slem,
+                                       predicted_iterations=estimate.predicted_iterations,
+                                       max_iterations=self.max_iterations)
+        return self.max_iterations
+
+    def _record_run_end(self, run_start, iterations, outcome, final_std):
+        """记录一次 run_until_convergence 的汇总事件"""
+        instr = self.instrumentation
+        if instr is None:
+            return
+        instr.count('runs')
+        if outcome == 'converged':
+            instr.count('converged')
+        instr.event('run_end', iterations=iterations, outcome=outcome, final_std=float(final_std),
+                     seconds=time.perf_counter() - run_start)
+        instr.flush()
+
+    def run_ensemble(self, n_replicas, seeds=None, noise_std=0.0, max_iterations=None,
+                     tolerance=1e-6, window_size=5):
+        """
+        批量运行 K 个独立副本（状态保存为 N×K 矩阵，每轮一次性抽取全部噪声）。
+        参数:
+            n_replicas (int): 副本数 K。
+            seeds (list): 每个副本初始状态的随机种子；为 None 时所有副本从当前状态出发，
+                仅噪声实现不同（噪声蒙特卡洛）。
+            noise_std (float or array): 通信噪声标准差，可为长度K的数组（每个副本一个噪声水平）。
+            max_iterations (int): 最大迭代次数，默认使用 self.max_iterations。
+            tolerance (float): 收敛阈值（标准差连续 window_size 轮低于该值）。
+        返回:
+            dict: iterations / converged / final_states / final_std / consensus_value，
+            均按副本给出。不修改智能体状态与 state_history。
+        """
+        engine = self._get_batch_engine()
+        if not self._bind_batch(engine):
+            raise ValueError("批量模式要求所有策略实现批量接口 compute_next_states")
+        if max_iterations is None:
+            max_iterations = self.max_iterations
+        run_start = time.perf_counter()
+
+        # ===== 初始化 N×K 状态矩阵 =====
+        if seeds is None:
+            states = np.repeat(self._current_states()[:, None], n_replicas, axis=1)
+        else:
+            if len(seeds) != n_replicas:
+                raise ValueError("seeds 的长度必须等于 n_replicas")
+            low, high = self.initial_state_range
+            states = np.column_stack([
+                initial_state_rng(seed).uniform(low, high, self.n_agents) for seed in seeds
+            ])
+        noise_std = np.broadcast_to(np.asarray(noise_std, dtype=float), (n_replicas,))
+        # 每个副本的策略内部状态独立保存
+        state_store = StrategyStateStore((self.n_agents, n_replicas))
+
+        # ===== 按副本维护收敛窗口，已收敛的副本不再参与计算 =====
+        iterations = np.full(n_replicas, max_iterations)
+        converged = np.zeros(n_replicas, dtype=bool)
+        below_count = np.zeros(n_replicas, dtype=int)
+        active = np.arange(n_replicas)
+        for iteration in range(max_iterations):
+            new_states = engine.step(states[:, active], state_store, noise_std=noise_std[active],
+                                     step=iteration, columns=active, noise=self.noise)
+            states[:, active] = new_states
+            below = np.std(new_states, axis=0) < tolerance
+            below_count[active] = np.where(below, below_count[active] + 1, 0)
+
+            done = below_count[active] >= window_size
+            if np.any(done):
+                iterations[active[done]] = iteration + 1
+                converged[active[done]] = True
+                active = active[~done]
+                if len(active) == 0:
+                    break
+
+        instr = self.instrumentation
+        if instr is not None:
+            instr.count('ensemble_runs')
+            instr.event('ensemble_end', n_replicas=n_replicas, converged=int(converged.sum()),
+                        max_iterations=int(iterations.max()), seconds=time.perf_counter() - run_start)
+            instr.flush()
+        return {
+            'iterations': iterations,
+            'converged': converged,
+            'final_states': states,
+            'final_std': np.std(states, axis=0),
+            'consensus_value': np.mean(states, axis=0),
+        }
\ No newline at end of file
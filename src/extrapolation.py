@@ -0,0 +1,90 @@
+# src/extrapolation.py
+"""
+向量外推：由线性迭代 x_{t+1} = W x_t + c 的一小段轨迹估计极限 s = lim x_t。
+设差分 u_i = x_{i+1} - x_i，U = [u_0, …, u_k]，极限取为最近 k+1 个迭代值的仿射组合 s = Σ γ_i x_i（Σ γ_i = 1）：
+- RRE（reduced rank extrapolation）：γ 使 ‖U γ‖ 最小，γ ∝ (UᵀU)⁻¹ 1
+- MPE（minimal polynomial extrapolation）：取 c 使 U[:, :k] c ≈ -u_k，γ = (c, 1) / Σ(c, 1)
+误差由 k 个主导模态张成时外推是精确的；环形等慢混合拓扑上，少数最慢模态决定了迭代轮数，
+外推消去这些模态后，剩余误差以快得多的速率衰减。
+"""
+from collections import deque
+
+import numpy as np
+
+EXTRAPOLATION_METHODS = ('rre', 'mpe')
+
+
+def extrapolate(states, method='rre'):
+    """
+    由连续迭代值估计极限。
+    参数:
+        states: 形状 (k+2, N) 的连续迭代值（按时间顺序）。
+        method (str): 'rre' 或 'mpe'。
+    返回:
+        极限估计（N 维向量）；系数退化（如轨迹已不再变化）时返回最后一个迭代值。
+    """
+    if method not in EXTRAPOLATION_METHODS:
+        raise ValueError(f"未知的外推方法: {method}")
+    X = np.asarray(states, dtype=float)
+    U = np.diff(X, axis=0).T
+    scale = np.linalg.norm(U, axis=0)
+    if not np.all(scale > 0):
+        return X[-1].copy()
+    if method == 'rre':
+        # 消去约束 γ_k = 1 - Σ_{i<k} γ_i：U γ = u_k + Σ_{i<k} γ_i (u_i - u_k)，直接最小二乘（不形成法方程）
+        gamma = np.linalg.lstsq(U[:, :-1] - U[:, -1:], -U[:, -1], rcond=None)[0]
+        weights = np.append(gamma, 1.0 - gamma.sum())
+    else:
+        U = U / scale  # 列归一化，缓解慢衰减时的病态
+        c = np.linalg.lstsq(U[:, :-1], -U[:, -1], rcond=None)[0]
+        weights = np.append(c, 1.0) / scale
+    total = weights.sum()
+    if not np.isfinite(total) or abs(total) < 1e-300:
+        return X[-1].copy()
+    return X[:-1].T @ (weights / total)
+
+
+class VectorExtrapolator:
+    """
+    保存最近 window + 1 个迭代值，按需外推极限，并以标准差、残差与相邻两次外推的变化量检验估计。
+    参数:
+        window (int): 外推使用的差分个数 k + 1（越大能消去的慢模态越多，代价 O(N·window²)）。
+        method (str): 'rre' 或 'mpe'。
+    """
+    def __init__(self, window=10, method='rre'):
+        if window < 2:
+            raise ValueError("外推窗口必须 >= 2")
+        if method not in EXTRAPOLATION_METHODS:
+            raise ValueError(f"未知的外推方法: {method}")
+        self.window = window
+        self.method = method
+        self._states = deque(maxlen=window + 1)
+        self.previous = None
+        self.std = np.inf
+        self.residual = np.inf
+        self.change = np.inf
+
+    @property
+    def ready(self):
+        return len(self._states) == self._states.maxlen
+
+    def push(self, states):
+        self._states.append(np.array(states, dtype=float))
+
+    def estimate(self, update, tolerance):
+        """
+        外推极限并检验，满足以下全部条件时返回 s，否则返回 None：
+        - std(s) < tolerance（与 run_until_convergence 的收敛判定一致）；
+        - 残差 max|W s - s| < tolerance；
+        - 相邻两次外推的最大变化量 < tolerance。
+        慢混合拓扑上残差约为谱间隙 × 误差，只检验残差会过早判定收敛，因此必须同时检验 std(s)。
+        update 为提供 apply(x) = W x 的线性更新（见 spectral.LinearUpdate）。
+        """
+        limit = extrapolate(list(self._states), self.method)
+        self.std = float(np.std(limit))
+        self.residual = float(np.max(np.abs(update.apply(limit) - limit)))
+        self.change = np.inf if self.previous is None else float(np.max(np.abs(limit - self.previous)))
+        self.previous = limit
+        if self.std < tolerance and self.residual < tolerance and self.change < tolerance:
+            return limit
+        return None
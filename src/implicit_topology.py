@@ -0,0 +1,157 @@
+# src/implicit_topology.py
+"""
+隐式拓扑：全连接与星型网络不构建任何边表。
+- 全连接：邻居和 = 全局和 - 自身，每轮 O(n)
+- 星型：叶节点的邻居只有中心；中心的邻居和 = 全局和 - 中心
+节点编号与 generate_topology 保持一致（星型中心为 n_agents - 1）。
+"""
+import itertools
+from collections.abc import Mapping, Sequence
+
+import numpy as np
+
+from .sparse_engine import BatchEngine
+
+IMPLICIT_TOPOLOGIES = ('complete', 'star')
+
+
+class CompleteNeighbors(Sequence):
+    """全连接图中节点 node 的邻居序列（除自身外的全部节点），不展开为列表"""
+    def __init__(self, node, n_agents):
+        self.node = node
+        self.n_agents = n_agents
+
+    def __len__(self):
+        return max(self.n_agents - 1, 0)
+
+    def __getitem__(self, k):
+        if isinstance(k, slice):
+            return [self[j] for j in range(*k.indices(len(self)))]
+        if k < 0:
+            k += len(self)
+        if not 0 <= k < len(self):
+            raise IndexError("邻居索引越界")
+        return k if k < self.node else k + 1
+
+    def __iter__(self):
+        return itertools.chain(range(self.node), range(self.node + 1, self.n_agents))
+
+    def __contains__(self, j):
+        return j != self.node and 0 <= j < self.n_agents
+
+    def __repr__(self):
+        if len(self) <= 10:
+            return repr(list(self))
+        return f"<除节点{self.node}外的全部{len(self)}个节点>"
+
+
+class ImplicitAdjacency(Mapping):
+    """隐式邻接表：按需生成邻居序列，接口与 get_adjacency_list 返回的字典一致"""
+    def __init__(self, topology_type, n_agents):
+        if topology_type not in IMPLICIT_TOPOLOGIES:
+            raise ValueError(f"拓扑类型 {topology_type} 不支持隐式表示")
+        self.topology_type = topology_type
+        self.n_agents = n_agents
+        self.hub = n_agents - 1
+
+    def __getitem__(self, node):
+        if not 0 <= node < self.n_agents:
+            raise KeyError(node)
+        if self.topology_type == 'complete':
+            return CompleteNeighbors(node, self.n_agents)
+        if node == self.hub:
+            return range(self.hub)
+        return [self.hub]
+
+    def __iter__(self):
+        return iter(range(self.n_agents))
+
+    def __len__(self):
+        return self.n_agents
+
+
+def _aggregate_edge_noise(neighbor_sum, neighbor_sumsq, values_sum, values_sumsq, degree, noise_std, noise):
+    """
+    将 degree 条独立边噪声按接收方聚合后叠加到邻居和上（联合分布与逐边抽取完全一致）。
+    把 e/σ 在正交基 {1/√d, 邻居值去均值后的方向, 其余 d-2 维} 上分解为 z1、z2 与 w：
+    - 邻居和的噪声项 Σe = σ√d·z1
+    - 平方和中的交叉项 Σx·e = σ(Σx/√d·z1 + ‖x - x̄‖·z2)
+    - 噪声二次项 Σe² = σ²(z1² + z2² + ‖w‖²)，‖w‖² ~ χ²_{d-2}（d = 1 时只有 z1²）
+    """
+    shape = np.broadcast_shapes(np.shape(neighbor_sum), np.shape(noise_std))
+    z1 = noise.draw(shape, 1.0)
+    noise_std = np.asarray(noise_std)
+    sqrt_degree = np.sqrt(degree)
+    neighbor_sum = neighbor_sum + noise_std * sqrt_degree * z1
+    if neighbor_sumsq is None:
+        return neighbor_sum, None
+
+    z2 = noise.draw(shape, 1.0)
+    safe_degree = np.maximum(sqrt_degree, 1.0)
+    residual = np.sqrt(np.maximum(values_sumsq - values_sum ** 2 / np.maximum(degree, 1), 0.0))
+    cross = noise_std * (values_sum / safe_degree * z1 + residual * z2)
+    # χ²_k = 2·Gamma(k/2)；standard_gamma(0) 为 0，无需单独处理 d <= 2
+    rest = 2.0 * noise.rng.standard_gamma(np.broadcast_to(np.maximum(degree - 2, 0) / 2.0, shape))
+    quadratic = z1 * z1 + np.where(degree >= 2, z2 * z2, 0.0) + rest
+    neighbor_sumsq = neighbor_sumsq + 2 * cross + noise_std ** 2 * quadratic
+    return neighbor_sum, neighbor_sumsq
+
+
+class CompleteEngine(BatchEngine):
+    """全连接网络的O(n)引擎：邻居和 = 全局和 - 自身"""
+    def __init__(self, n_agents):
+        super().__init__(n_agents, np.full(n_agents, max(n_agents - 1, 0), dtype=np.int64))
+
+    def neighbor_sums(self, states, noise_std=0.0, with_sumsq=False, noise=None):
+        neighbor_sum = states.sum(axis=0) - states
+        neighbor_sumsq = None
+        if with_sumsq:
+            squares = states * states
+            neighbor_sumsq = squares.sum(axis=0) - squares
+        if np.any(np.asarray(noise_std) > 0):
+            degree = self.degree.reshape((-1,) + (1,) * (states.ndim - 1))
+            neighbor_sum, neighbor_sumsq = _aggregate_edge_noise(
+                neighbor_sum, neighbor_sumsq, neighbor_sum, neighbor_sumsq, degree, noise_std, noise
+            )
+        return neighbor_sum, neighbor_sumsq
+
+
+class StarEngine(BatchEngine):
+    """星型网络的O(n)引擎：叶节点只接收中心状态，中心接收全部叶节点状态"""
+    def __init__(self, n_agents):
+        degree = np.ones(n_agents, dtype=np.int64)
+        self.hub = n_agents - 1
+        degree[self.hub] = n_agents - 1
+        super().__init__(n_agents, degree)
+
+    def neighbor_sums(self, states, noise_std=0.0, with_sumsq=False, noise=None):
+        hub = self.hub
+        noisy = np.any(np.asarray(noise_std) > 0)
+        squares = states * states if with_sumsq else None
+
+        # 叶节点：唯一邻居为中心（每个叶节点一条边，直接逐边抽取噪声）
+        neighbor_sum = np.broadcast_to(states[hub], states.shape).copy()
+        if noisy:
+            neighbor_sum += noise.draw(states.shape, noise_std)
+        neighbor_sumsq = neighbor_sum * neighbor_sum if with_sumsq else None
+
+        # 中心：全部叶节点之和
+        hub_sum = states.sum(axis=0) - states[hub]
+        hub_sumsq = squares.sum(axis=0) - squares[hub] if with_sumsq else None
+        if noisy:
+            hub_sum, hub_sumsq = _aggregate_edge_noise(
+                hub_sum, hub_sumsq, hub_sum, hub_sumsq, self.degree[hub], noise_std, noise
+            )
+        neighbor_sum[hub] = hub_sum
+        if with_sumsq:
+            neighbor_sumsq[hub] = hub_sumsq
+        return neighbor_sum, neighbor_sumsq
+
+
+def make_implicit_engine(topology_type, n_agents):
+    """根据拓扑类型创建隐式引擎"""
+    if topology_type == 'complete':
+        return CompleteEngine(n_agents)
+    if topology_type == 'star':
+        return StarEngine(n_agents)
+    raise ValueError(f"拓扑类型 {topology_type} 不支持隐式表示")
@@ -0,0 +1,159 @@
+# src/instrumentation.py
+"""
+结构化性能统计：
+- SimulationStats 按阶段累计耗时（次数 / 总计 / 最小 / 最大），并维护计数器
+- Instrumentation 将阶段耗时与事件写入统计对象，可选写入 JSONL 文件（每行一个事件）
+模拟器未启用统计时 instrumentation 为 None，热路径上只有一次 None 判断，没有计时开销。
+JSONL 文件只在写入时打开：模拟器在每次运行结束时调用 flush，写出缓冲的事件并关闭文件，
+进程异常退出最多丢失当前这次运行的事件，同一进程中反复创建模拟器也不会累积打开的文件句柄。
+"""
+import json
+import time
+from contextlib import contextmanager
+
+
+class PhaseTimer:
+    """单个阶段的耗时统计"""
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.min = float('inf')
+        self.max = 0.0
+
+    def add(self, seconds):
+        self.count += 1
+        self.total += seconds
+        if seconds < self.min:
+            self.min = seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
+
+    def as_dict(self):
+        return {'count': self.count, 'total': self.total, 'mean': self.mean,
+                'min': self.min if self.count else 0.0, 'max': self.max}
+
+
+class SimulationStats:
+    """阶段耗时与计数器"""
+    def __init__(self):
+        self.timers = {}
+        self.counters = {}
+
+    def add_time(self, phase, seconds):
+        timer = self.timers.get(phase)
+        if timer is None:
+            timer = self.timers[phase] = PhaseTimer()
+        timer.add(seconds)
+
+    def incr(self, name, n=1):
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def total_time(self):
+        return sum(timer.total for timer in self.timers.values())
+
+    def as_dict(self):
+        return {'timers': {phase: timer.as_dict() for phase, timer in self.timers.items()},
+                'counters': dict(self.counters)}
+
+    def reset(self):
+        self.timers = {}
+        self.counters = {}
+
+    def report(self):
+        """按总耗时降序排列的文本报告"""
+        total = self.total_time() or 1.0
+        lines = [f"{'阶段':16}{'次数':>10}{'总计(s)':>12}{'平均(ms)':>12}{'占比':>8}"]
+        for phase, timer in sorted(self.timers.items(), key=lambda item: -item[1].total):
+            lines.append(f"{phase:18}{timer.count:>10}{timer.total:>12.4f}"
+                         f"{timer.mean * 1000:>12.4f}{timer.total / total:>8.1%}")
+        for name, value in self.counters.items():
+            lines.append(f"{name}: {value}")
+        return '\n'.join(lines)
+
+
+class JSONLSink:
+    """将事件逐行写入 JSONL 文件（追加模式）；文件在首次写入时打开，flush / close 后关闭"""
+    def __init__(self, path):
+        self.path = path
+        self._file = None
+
+    def write(self, event):
+        if self._file is None:
+            self._file = open(self.path, 'a', encoding='utf-8')
+        self._file.write(json.dumps(event, ensure_ascii=False, default=str) + '\n')
+
+    def flush(self):
+        """写出缓冲的事件并关闭文件（之后的写入会重新以追加模式打开）"""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def close(self):
+        self.flush()
+
+
+class Instrumentation:
+    """
+    性能统计入口。
+    参数:
+        sink: JSONL 文件路径或带 write(event) 方法的对象；None 表示只在内存中统计。
+        iteration_events (bool): 是否把每一轮迭代的阶段耗时都写入 sink（默认只写汇总事件）。
+    """
+    def __init__(self, sink=None, iteration_events=False):
+        self.stats = SimulationStats()
+        self.sink = JSONLSink(sink) if isinstance(sink, str) else sink
+        self.iteration_events = iteration_events
+
+    def record(self, phase, seconds, **fields):
+        """记录一次阶段耗时；带 iteration 字段的逐轮记录只在 iteration_events 时写入 sink"""
+        self.stats.add_time(phase, seconds)
+        if self.sink is not None and (self.iteration_events or 'iteration' not in fields):
+            self.sink.write({'event': 'phase', 'phase': phase, 'seconds': seconds,
+                             'time': time.time(), **fields})
+
+    def count(self, name, n=1):
+        self.stats.incr(name, n)
+
+    def event(self, name, **fields):
+        """写入一个结构化事件（如一次运行结束）"""
+        if self.sink is not None:
+            self.sink.write({'event': name, 'time': time.time(), **fields})
+
+    @contextmanager
+    def phase(self, name, **fields):
+        """计时上下文：with instrumentation.phase('topology'): ..."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start, **fields)
+
+    def flush(self):
+        """把已写入 sink 的事件落盘（模拟器在每次运行结束时调用）"""
+        if self.sink is not None and hasattr(self.sink, 'flush'):
+            self.sink.flush()
+
+    def close(self):
+        if self.sink is not None and hasattr(self.sink, 'close'):
+            self.sink.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def make_instrumentation(instrument):
+    """将模拟器的 instrument 参数（False / True / JSONL 路径 / Instrumentation）转换为实例或 None"""
+    if instrument is None or instrument is False:
+        return None
+    if instrument is True:
+        return Instrumentation()
+    if isinstance(instrument, str):
+        return Instrumentation(sink=instrument)
+    return instrument
@@ -1,16 +1,22 @@
 # network_generator.py
-import networkx as nx
+# networkx 只在构建 networkx 图（generate_topology / csr_to_graph）时才导入；模拟只使用 generate_csr
 import numpy as np
-import random
 
 def generate_topology(topology_type, n_agents, **kwargs):
     """
     根据类型生成网络拓扑。
     参数:
-        topology_type: 'complete'（全连接）, 'ring'（环形）, 'star'（星型）, 'small_world'（小世界）
+        topology_type: 'complete'（全连接）, 'ring'（环形）, 'star'（星型）, 'small_world'（小世界）,
+            'lattice'（k-正则环形格子）, 'erdos_renyi'（随机图）, 'barabasi_albert'（无标度）
         n_agents: 智能体数量
-        **kwargs: 其他参数
+        **kwargs: 其他参数（small_world 的 k、p；lattice 的 k；erdos_renyi 的 p；
+            barabasi_albert 的 m；seed 为随机图的整数种子）
+    注意：模拟器使用 generate_csr 的 NumPy 原生实现，随机拓扑与此处的 networkx 实现并不相同；
+    需要与模拟器一致的 networkx 图时使用 csr_to_graph。
     """
+    import networkx as nx
+
+    seed = kwargs.get('seed')
     if topology_type == 'complete':
         G = nx.complete_graph(n_agents)
         
@@ -30,20 +36,265 @@ def generate_topology(topology_type, n_agents, **kwargs):
         # 小世界网络（Watts-Strogatz模型）
         k = kwargs.get('k', 4)    # 每个节点连接的邻居数（偶数）
         p = kwargs.get('p', 0.1)  # 重连概率
-        G = nx.watts_strogatz_graph(n_agents, k, p)
-        
+        G = nx.watts_strogatz_graph(n_agents, k, p, seed=seed)
+
+    elif topology_type == 'lattice':
+        G = nx.watts_strogatz_graph(n_agents, kwargs.get('k', 4), 0.0)
+
+    elif topology_type == 'erdos_renyi':
+        G = nx.gnp_random_graph(n_agents, kwargs.get('p', 0.1), seed=seed)
+
+    elif topology_type == 'barabasi_albert':
+        G = nx.barabasi_albert_graph(n_agents, kwargs.get('m', 2), seed=seed)
+
     else:
         raise ValueError(f"未知的拓扑类型: {topology_type}")
     
     return G
 
+class CSRTopology:
+    """
+    CSR形式的拓扑：indptr / indices 两个整数数组，第 i 行为节点 i 的邻居（保留生成时的邻居顺序）。
+    数组可以是只读内存映射（来自拓扑缓存），使用方不应原地修改。
+    """
+    def __init__(self, indptr, indices, n_agents):
+        self.indptr = indptr
+        self.indices = indices
+        self.n_agents = n_agents
+
+    @property
+    def degree(self):
+        return np.diff(self.indptr)
+
+    @property
+    def n_edges(self):
+        """无向边数"""
+        return len(self.indices) // 2
+
+    def neighbors(self, node):
+        return self.indices[self.indptr[node]:self.indptr[node + 1]]
+
+    def adjacency_list(self):
+        """转换为邻接列表（字典），与 get_adjacency_list 的结果一致"""
+        indices = self.indices.tolist()
+        indptr = self.indptr.tolist()
+        return {i: indices[indptr[i]:indptr[i + 1]] for i in range(self.n_agents)}
+
+    def to_scipy(self):
+        """权重全为1的 scipy CSR 邻接矩阵"""
+        import scipy.sparse as sp
+        return sp.csr_matrix((np.ones(len(self.indices)), self.indices, self.indptr),
+                             shape=(self.n_agents, self.n_agents))
+
+
+def graph_to_csr(G, n_agents):
+    """将节点编号为 0..n-1 的 networkx 图转换为 CSRTopology（邻居顺序与 G.neighbors 一致）"""
+    degree = np.fromiter((len(G[i]) for i in range(n_agents)), dtype=np.int64, count=n_agents)
+    indptr = np.zeros(n_agents + 1, dtype=np.int64)
+    np.cumsum(degree, out=indptr[1:])
+    indices = np.fromiter((j for i in range(n_agents) for j in G.neighbors(i)),
+                          dtype=np.int64, count=int(indptr[-1]))
+    return CSRTopology(indptr, indices, n_agents)
+
+
+def csr_to_graph(topology):
+    """由 CSRTopology 构建 networkx 图（仅用于绘图等需要 networkx 的场合）"""
+    import networkx as nx
+
+    G = nx.Graph()
+    G.add_nodes_from(range(topology.n_agents))
+    rows = np.repeat(np.arange(topology.n_agents), topology.degree)
+    upper = rows < topology.indices
+    G.add_edges_from(zip(rows[upper].tolist(), np.asarray(topology.indices)[upper].tolist()))
+    return G
+
+
+# ===== NumPy 原生生成器：直接输出CSR数组，不经过 networkx =====
+
+def edges_to_csr(u, v, n_agents):
+    """
+    由无向边列表 (u[e], v[e]) 构建 CSRTopology，每行邻居按编号升序排列。
+    调用方保证边不重复、无自环。
+    """
+    u = np.asarray(u, dtype=np.int64)
+    v = np.asarray(v, dtype=np.int64)
+    # 按 (行, 列) 排序：对合并键 row·n + col 直接排序，无需 argsort 与重排
+    keys = np.concatenate([u * n_agents + v, v * n_agents + u])
+    keys.sort()
+    indices = keys % n_agents
+    indptr = np.zeros(n_agents + 1, dtype=np.int64)
+    np.cumsum(np.bincount(keys // n_agents, minlength=n_agents), out=indptr[1:])
+    return CSRTopology(indptr, indices, n_agents)
+
+
+def _lattice_edges(n_agents, k):
+    """k-正则环形格子的边：每个节点与左右各 k//2 个节点相连（下标运算，无循环）"""
+    half = min(k // 2, (n_agents - 1) // 2)
+    u = np.tile(np.arange(n_agents), half)
+    offsets = np.repeat(np.arange(1, half + 1), n_agents)
+    v = (u + offsets) % n_agents
+    if n_agents % 2 == 0 and k // 2 >= n_agents // 2 and n_agents > 1:
+        # k 接近 n 时对径边 (i, i+n/2) 只保留一份
+        u_mid = np.arange(n_agents // 2)
+        u = np.concatenate([u, u_mid])
+        v = np.concatenate([v, u_mid + n_agents // 2])
+    return u, v
+
+
+def _complete_csr(n_agents):
+    """全连接：第 i 行为除 i 外的全部节点"""
+    if n_agents < 2:
+        return CSRTopology(np.zeros(n_agents + 1, dtype=np.int64), np.zeros(0, dtype=np.int64), n_agents)
+    grid = np.tile(np.arange(n_agents - 1, dtype=np.int64), (n_agents, 1))
+    grid += grid >= np.arange(n_agents)[:, None]
+    indptr = np.arange(0, n_agents * (n_agents - 1) + 1, n_agents - 1, dtype=np.int64)
+    return CSRTopology(indptr, grid.ravel(), n_agents)
+
+
+def _star_csr(n_agents):
+    """星型：中心为 n_agents - 1"""
+    hub = n_agents - 1
+    leaves = np.arange(hub, dtype=np.int64)
+    return edges_to_csr(leaves, np.full(hub, hub, dtype=np.int64), n_agents)
+
+
+def _watts_strogatz_csr(n_agents, k, p, rng):
+    """
+    向量化的 Watts-Strogatz 重连：格子中每条边 (u, u+j) 以概率 p 将终点换成均匀随机节点。
+    与 networkx 相同，等待重连的边在重连完成前仍占据原来的位置；新终点构成自环、重边
+    （与已确定的边、其他等待中的边的原边或同一轮先到的重连结果重合）时重抽，边数始终为格子的边数。
+    若干轮后仍未完成的少数边（极稠密的图）逐条在全部合法终点中均匀选取，没有合法终点时保留原边。
+    """
+    u, v = _lattice_edges(n_agents, k)
+    if p <= 0 or n_agents < 3:
+        return edges_to_csr(u, v, n_agents)
+    original = v
+    v = v.copy()
+    original_keys = np.minimum(u, v) * n_agents + np.maximum(u, v)
+    pending = np.flatnonzero(rng.random(len(u)) < p)
+    for _ in range(100):
+        if len(pending) == 0:
+            break
+        v[pending] = rng.integers(0, n_agents, len(pending))
+        is_pending = np.zeros(len(u), dtype=bool)
+        is_pending[pending] = True
+        keys = np.minimum(u, v) * n_agents + np.maximum(u, v)
+        # 已确定的边与等待中的原边优先（它们两两不同），重连结果与之重合或与同轮更早的重连结果重合时重抽
+        combined = np.concatenate([keys[~is_pending], original_keys[pending], keys[pending]])
+        priority = np.concatenate([np.zeros(len(u), dtype=np.int8), np.ones(len(pending), dtype=np.int8)])
+        order = np.lexsort((priority, combined))
+        duplicate = np.zeros(len(combined), dtype=bool)
+        duplicate[order[1:]] = combined[order[1:]] == combined[order[:-1]]
+        bad = (u[pending] == v[pending]) | duplicate[len(u):]
+        pending = pending[bad]
+    if len(pending):
+        v[pending] = original[pending]
+        existing = set((np.minimum(u, v) * n_agents + np.maximum(u, v)).tolist())
+        for e in pending.tolist():
+            source = int(u[e])
+            candidates = [w for w in range(n_agents)
+                          if w != source and min(source, w) * n_agents + max(source, w) not in existing]
+            if not candidates:
+                continue
+            target = candidates[int(rng.integers(len(candidates)))]
+            existing.discard(int(original_keys[e]))
+            existing.add(min(source, target) * n_agents + max(source, target))
+            v[e] = target
+    return edges_to_csr(u, v, n_agents)
+
+
+def _sorted_unique(values):
+    """排序去重（对大整数数组比 np.unique 的哈希实现更快）"""
+    values = np.sort(values)
+    if len(values) == 0:
+        return values
+    keep = np.empty(len(values), dtype=bool)
+    keep[0] = True
+    np.not_equal(values[1:], values[:-1], out=keep[1:])
+    return values[keep]
+
+
+def _erdos_renyi_csr(n_agents, p, rng):
+    """
+    G(n, p) 随机图，O(n + m)：先抽取边数 m ~ Binomial(n(n-1)/2, p)，
+    再在全部节点对的线性编号中无放回抽取 m 个并还原为 (i, j)。
+    """
+    n_pairs = n_agents * (n_agents - 1) // 2
+    if n_pairs == 0 or p <= 0:
+        return edges_to_csr(np.zeros(0, np.int64), np.zeros(0, np.int64), n_agents)
+    m = rng.binomial(n_pairs, min(p, 1.0))
+    pairs = _sorted_unique(rng.integers(0, n_pairs, m))
+    while len(pairs) < m:
+        extra = rng.integers(0, n_pairs, m - len(pairs))
+        pairs = _sorted_unique(np.concatenate([pairs, extra]))
+    # 线性编号 idx 对应上三角 (i, j)：第 i 行之前共有 i·n - i(i+1)/2 个节点对
+    n = n_agents
+    i = (n - 2 - np.floor(np.sqrt(-8.0 * pairs + 4.0 * n * (n - 1) - 7) / 2.0 - 0.5)).astype(np.int64)
+    j = pairs + i + 1 - n * (n - 1) // 2 + (n - i) * (n - i - 1) // 2
+    return edges_to_csr(i, j, n_agents)
+
+
+def _barabasi_albert_csr(n_agents, m, rng):
+    """
+    Barabási-Albert 优先连接，O(n·m)：从 m+1 个节点的星型出发，每个新节点从
+    “按度数重复的节点列表”中均匀抽取 m 个不同的目标（与 networkx 的构造相同）。
+    构造本质上是串行的；均匀随机数按块预先抽取，内层循环只做列表操作。
+    """
+    if m < 1 or m >= n_agents:
+        raise ValueError("barabasi_albert 的 m 必须满足 1 <= m < n_agents")
+    targets_per_source = []
+    repeated = [0] * m + list(range(1, m + 1))
+    chunk = max(1024, min((n_agents - m) * m * 2, 1 << 20))
+    uniforms = []
+    position = 0
+    for source in range(m + 1, n_agents):
+        targets = set()
+        length = len(repeated)
+        while len(targets) < m:
+            if position == len(uniforms):
+                uniforms = rng.random(chunk).tolist()
+                position = 0
+            targets.add(repeated[int(uniforms[position] * length)])
+            position += 1
+        targets = list(targets)
+        targets_per_source.append(targets)
+        repeated.extend(targets)
+        repeated.extend([source] * m)
+
+    u = np.concatenate([np.zeros(m, dtype=np.int64),
+                        np.repeat(np.arange(m + 1, n_agents, dtype=np.int64), m)])
+    v = np.concatenate([np.arange(1, m + 1, dtype=np.int64),
+                        np.array(targets_per_source, dtype=np.int64).reshape(-1)])
+    return edges_to_csr(u, v, n_agents)
+
+
+def generate_csr(topology_type, n_agents, seed=None, **kwargs):
+    """
+    NumPy 原生拓扑生成器，直接返回 CSRTopology（每行邻居升序）。
+    参数与 generate_topology 相同；seed 为整数种子或 numpy Generator。
+    """
+    rng = np.random.default_rng(seed)
+    if topology_type == 'complete':
+        return _complete_csr(n_agents)
+    if topology_type == 'ring':
+        return edges_to_csr(*_lattice_edges(n_agents, 2), n_agents)
+    if topology_type == 'lattice':
+        return edges_to_csr(*_lattice_edges(n_agents, kwargs.get('k', 4)), n_agents)
+    if topology_type == 'star':
+        return _star_csr(n_agents)
+    if topology_type == 'small_world':
+        return _watts_strogatz_csr(n_agents, kwargs.get('k', 4), kwargs.get('p', 0.1), rng)
+    if topology_type == 'erdos_renyi':
+        return _erdos_renyi_csr(n_agents, kwargs.get('p', 0.1), rng)
+    if topology_type == 'barabasi_albert':
+        return _barabasi_albert_csr(n_agents, kwargs.get('m', 2), rng)
+    raise ValueError(f"未知的拓扑类型: {topology_type}")
+
+
 def get_adjacency_list(G):
     """将networkx图转换为邻接列表（字典）"""
     adj_list = {}
     for node in G.nodes():
         neighbors = list(G.neighbors(node))
         adj_list[node] = neighbors
-        # 调试输出
-        if node < 3:  # 只显示前3个节点
-            print(f"  节点{node}的邻居: {neighbors}")
     return adj_list
\ No newline at end of file
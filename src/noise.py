@@ -0,0 +1,49 @@
+# src/noise.py
+"""
+通信噪声：
+- 'edge'   逐条边独立噪声：每个接收方收到的每个邻居状态各自叠加一份噪声（原模拟器的行为）
+- 'sender' 逐发送方噪声：每个智能体每轮广播一个带噪声的状态，所有邻居收到同一个值
+噪声按块预生成：一次抽取 chunk_size 轮的标准正态数，逐轮取用。
+Generator 按顺序填充数组，因此分块抽取与逐轮抽取得到完全相同的随机数序列。
+"""
+import numpy as np
+
+NOISE_MODELS = ('edge', 'sender')
+
+
+class NoiseSource:
+    """
+    按块预生成噪声的随机数源。
+    每种形状各缓存一个 chunk_size×shape 的标准正态块（内存为 chunk_size 倍单轮噪声），
+    只保留最近使用的 MAX_CACHED_SHAPES 种形状（如批量副本收敛后活跃列变化产生的新形状）。
+    """
+    MAX_CACHED_SHAPES = 2
+
+    def __init__(self, rng, model='edge', chunk_size=1):
+        if model not in NOISE_MODELS:
+            raise ValueError(f"未知的噪声模型: {model}")
+        if chunk_size < 1:
+            raise ValueError("chunk_size 必须 >= 1")
+        self.rng = rng
+        self.model = model
+        self.chunk_size = chunk_size
+        self._blocks = {}
+
+    def draw(self, shape, scale):
+        """抽取一轮形状为 shape 的噪声，标准差为 scale（可与 shape 广播，如逐副本的噪声水平）"""
+        shape = tuple(shape) if np.ndim(shape) else (int(shape),)
+        if self.chunk_size == 1:
+            return scale * self.rng.standard_normal(shape)
+        entry = self._blocks.pop(shape, None)
+        if entry is None or entry[1] == self.chunk_size:
+            entry = [self.rng.standard_normal((self.chunk_size,) + shape), 0]
+        standard = entry[0][entry[1]]
+        entry[1] += 1
+        self._blocks[shape] = entry
+        while len(self._blocks) > self.MAX_CACHED_SHAPES:
+            del self._blocks[next(iter(self._blocks))]
+        return scale * standard
+
+    def reset(self):
+        """丢弃尚未使用的预生成噪声"""
+        self._blocks = {}
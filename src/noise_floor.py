@@ -0,0 +1,164 @@
+# src/noise_floor.py
+"""
+通信噪声下的稳态分歧方差（噪声底）：
+线性策略在加性高斯噪声下 x_{t+1} = W x_t + ξ_t，ξ_t 的协方差 Σ_ξ 由噪声模型决定
+- 'edge'：每条有向边独立噪声，ξ_i = b_i Σ_{j∈N(i)} e_ij，Σ_ξ = σ² diag(b² d)
+- 'sender'：每个发送方一个噪声，ξ = diag(b) A e，Σ_ξ = σ² diag(b) A² diag(b)
+共识情形下平均值做随机游走，分歧 Π x（Π = I - 11ᵀ/N）却有平稳分布：
+Π x_t = Π W̃^t x_0 + Σ_s Π W̃^s ξ_{t-1-s}，W̃ = W - 1πᵀ（π 为左 Perron 向量，谱半径为 SLEM < 1），
+因此平稳协方差 Σ 满足离散 Lyapunov 方程 Σ = W̃ Σ W̃ᵀ + Σ_ξ，
+模拟器报告的标准差平方的期望为 E[std²] = tr(Π Σ Π) / N。
+存在锚定个体（b = 0）且每个连通分量都含锚定个体时，改为只在自由个体上求解 Σ_FF = W_FF Σ_FF W_FFᵀ + Σ_ξ,FF，
+此时稳态 x* 本身不是共识，E[std²] 还要加上确定性的分歧 ‖Π x*‖² / N（见 spectral.solve_steady_state）。
+"""
+import math
+
+import numpy as np
+
+from .circulant import CirculantUpdate
+from .spectral import DENSE_MAX_AGENTS, LinearUpdate
+
+
+class NoiseFloor:
+    """
+    稳态分歧。
+    属性:
+        variance: E[std²]（每轮状态方差的平稳期望）= fluctuation + steady_spread
+        fluctuation: 噪声引起的涨落部分 tr(Π Σ Π) / N
+        steady_spread: 无噪声稳态自身的分歧 ‖Π x*‖² / N（共识情形为 0）
+        std: sqrt(variance)，即噪声底（与模拟器长时间运行后的标准差同量级）
+        stderr: variance 的标准误差（随机迹估计时；精确方法为 0）
+        method: 'circulant' / 'dense' / 'hutchinson'
+    """
+    def __init__(self, fluctuation, method, stderr=0.0, steady_spread=0.0):
+        self.fluctuation = float(fluctuation)
+        self.steady_spread = float(steady_spread)
+        self.variance = self.fluctuation + self.steady_spread
+        self.std = math.sqrt(max(self.variance, 0.0))
+        self.stderr = float(stderr)
+        self.method = method
+
+    def __repr__(self):
+        return (f"NoiseFloor(std={self.std:.6g}, variance={self.variance:.6g}, "
+                f"stderr={self.stderr:.3g}, method='{self.method}')")
+
+
+class _Dynamics:
+    """噪声底计算所需的 W̃ 作用与噪声因子 L（Σ_ξ = σ² L Lᵀ）"""
+    def __init__(self, update, model):
+        self.update = update
+        self.model = model
+        a, b = update.self_weight, update.neighbor_weight
+        degree = update.engine.degree.astype(float)
+        if np.any(np.abs(a + b * degree - 1) > 1e-9):
+            raise ValueError("更新矩阵不是行随机的，噪声底只适用于 a + b·度数 = 1 的线性策略")
+        n_components, labels = update.components()
+        anchored = b == 0
+        if update.mixes():
+            self.free = None
+            perron = 1.0 / b
+            self.perron = perron / perron.sum()
+        else:
+            anchored_components = np.zeros(n_components, dtype=bool)
+            anchored_components[labels[anchored]] = True
+            if not anchored_components.all():
+                raise ValueError("存在既不连通到整体、也不含锚定个体的分量，分歧方差没有平稳分布")
+            self.free = ~anchored
+            self.perron = None
+        self.degree = degree
+
+    def propagate(self, v):
+        """W̃ v（共识情形）或 W_FF v（锚定情形，锚定个体的分量保持为 0）"""
+        w = self.update.apply(v)
+        if self.free is None:
+            return w - np.outer(np.ones(len(w)), self.perron @ v).reshape(w.shape)
+        w[~self.free] = 0.0
+        return w
+
+    def noise_factor(self, probes):
+        """L g：对 K 个探测向量（N × K）施加噪声因子（σ = 1）"""
+        b = self.update.neighbor_weight[:, None]
+        if self.model == 'sender':
+            return b * self.update.engine.neighbor_sums(probes)[0]
+        return b * np.sqrt(self.degree)[:, None] * probes
+
+    def dense(self):
+        """稠密的 W̃（或 W_FF 嵌入为全尺寸）与 Σ_ξ（σ = 1）"""
+        n = self.update.n_agents
+        W = self.propagate(np.eye(n))
+        L = self.noise_factor(np.eye(n))
+        return W, L @ L.T
+
+
+def _disagreement(covariance):
+    """tr(Π Σ Π) / N"""
+    n = len(covariance)
+    return (np.trace(covariance) - covariance.sum() / n) / n
+
+
+def _steady_spread(sim, dynamics):
+    """锚定情形下无噪声稳态的分歧 ‖Π x*‖² / N"""
+    if dynamics.free is None:
+        return 0.0
+    from .spectral import solve_steady_state
+
+    return float(np.var(solve_steady_state(sim).states))
+
+
+def noise_floor(sim, noise_std, method='auto', n_probes=32, rtol=1e-8, max_terms=1000000, seed=0):
+    """
+    线性策略在通信噪声下的稳态分歧方差（无需蒙特卡洛）。
+    参数:
+        sim (ConsensusSimulator): 模拟器（噪声模型取 sim.noise.model）。
+        noise_std (float): 通信噪声标准差 σ（方差与 σ² 成正比）。
+        method (str): 'auto' / 'circulant' / 'dense' / 'hutchinson'。
+            'circulant'：环形 / 格子上权重一致时由 FFT 精确求和，O(N log N)；
+            'dense'：scipy.linalg.solve_discrete_lyapunov，O(N³)，N <= DENSE_MAX_AGENTS；
+            'hutchinson'：随机迹估计 tr(Π Σ Π) = Σ_s E‖Π W̃^s L g‖²，每项一次稀疏乘法，
+            级数按 SLEM² 几何衰减，末项低于 rtol × 累计值时停止。
+            'auto' 依次尝试 circulant、dense、hutchinson。
+        n_probes (int): 随机迹估计的探测向量数（标准误差约为 1/sqrt(n_probes) 的相对量级）。
+    返回:
+        NoiseFloor。
+    """
+    update = LinearUpdate(sim)
+    dynamics = _Dynamics(update, sim.noise.model)
+    n = update.n_agents
+    scale = noise_std ** 2
+
+    circulant = CirculantUpdate.from_update(update) if method in ('auto', 'circulant') else None
+    if method == 'circulant' and circulant is None:
+        raise ValueError("当前拓扑与策略的更新矩阵不是循环矩阵")
+    if circulant is not None and dynamics.free is None:
+        # 每个非共识模态独立：方差 = 输入功率 / (1 - λ_k²)
+        eigenvalues = circulant.eigenvalues()[1:]
+        a, b = update.self_weight[0], update.neighbor_weight[0]
+        if sim.noise.model == 'sender':
+            power = (eigenvalues - a) ** 2
+        else:
+            power = np.full(len(eigenvalues), b * b * dynamics.degree[0])
+        return NoiseFloor(scale * np.sum(power / (1.0 - eigenvalues ** 2)) / n, 'circulant')
+
+    if method == 'dense' or (method in ('auto', 'circulant') and n <= DENSE_MAX_AGENTS):
+        from scipy.linalg import solve_discrete_lyapunov
+
+        W, input_covariance = dynamics.dense()
+        covariance = solve_discrete_lyapunov(W, input_covariance)
+        return NoiseFloor(scale * _disagreement(covariance), 'dense',
+                          steady_spread=_steady_spread(sim, dynamics))
+
+    if method not in ('auto', 'hutchinson'):
+        raise ValueError(f"未知的噪声底计算方法: {method}")
+    rng = np.random.default_rng(seed)
+    v = dynamics.noise_factor(rng.choice([-1.0, 1.0], size=(n, n_probes)))
+    per_probe = np.zeros(n_probes)
+    for _ in range(max_terms):
+        term = np.sum((v - v.mean(axis=0)) ** 2, axis=0)
+        per_probe += term
+        if term.sum() <= rtol * per_probe.sum():
+            break
+        v = dynamics.propagate(v)
+    variance = per_probe.mean() / n
+    stderr = per_probe.std(ddof=1) / math.sqrt(n_probes) / n if n_probes > 1 else 0.0
+    return NoiseFloor(scale * variance, 'hutchinson', scale * stderr,
+                      steady_spread=_steady_spread(sim, dynamics))
@@ -0,0 +1,169 @@
+# src/parameter_sweep.py
+"""
+固定拓扑上的自身权重参数扫描：
+Stubborn(α) 与 Susceptible(β > 1) 的更新矩阵都是 W(w) = w I + (1 - w) P，P = D^{-1} A 为邻居平均矩阵
+（Stubborn 取 w = α，Susceptible 取 w = 1/β）。P 与对称矩阵 N = D^{-1/2} A D^{-1/2} 相似，
+对 N = Q Λ Qᵀ 只做一次特征分解，任意 w 的特征值即 μ = w + (1 - w) λ，且
+    x_t = D^{-1/2} Q (μ^t ∘ c),  c = Qᵀ D^{1/2} x_0
+因此几百个参数值的轨迹、收敛轮数与最终值只需在同一组特征向量上做向量化运算，无需重新模拟。
+Susceptible(β = 1) 退化为 DeGroot：W = (D + I)^{-1}(A + I)，不属于上述一族，
+对 A + I 再做一次分解并取 w = 0 处理（include_self=True）。
+"""
+import numpy as np
+
+from .spectral import DENSE_MAX_AGENTS
+
+
+class SelfWeightSweep:
+    """
+    W(w) = w I + (1 - w) D^{-1} A 的共享特征分解（A 可含自环，见 include_self）。
+    参数:
+        sim (ConsensusSimulator): 提供拓扑与初始状态（使用其当前状态）。
+        include_self (bool): 为 True 时分解 A + I（DeGroot 的“含自身平均”）。
+    """
+    def __init__(self, sim, include_self=False):
+        n = sim.n_agents
+        if n > DENSE_MAX_AGENTS:
+            raise ValueError(f"参数扫描使用稠密特征分解，智能体数不能超过 {DENSE_MAX_AGENTS}")
+        adjacency = sim._get_batch_engine().neighbor_sums(np.eye(n))[0]
+        if include_self:
+            adjacency = adjacency + np.eye(n)
+        degree = adjacency.sum(axis=1)
+        if np.any(degree == 0):
+            raise ValueError("存在无邻居的个体，参数扫描要求每个个体至少有一个邻居")
+        sqrt_degree = np.sqrt(degree)
+        normalized = adjacency / sqrt_degree[:, None] / sqrt_degree[None, :]
+        self.eigenvalues, self._eigenvectors = np.linalg.eigh((normalized + normalized.T) / 2)
+        self.n_agents = n
+        x0 = sim._current_states()
+        self.initial_states = x0
+        self._coefficients = self._eigenvectors.T @ (sqrt_degree * x0)
+        # 状态 x = D^{-1/2} Q v；去均值后的平方和 Σ(x - x̄)² = vᵀ G_c v，G_c 由去均值的基计算，
+        # 避免 Σx²/N - x̄² 在接近共识时的相消误差（std 低于约 1e-7·|x̄| 后只剩舍入误差）
+        basis = self._eigenvectors / sqrt_degree[:, None]
+        centered = basis - basis.mean(axis=0)
+        self._centered_gram = centered.T @ centered
+        self._basis = basis
+        # 共识模态（λ = 1）；连通图上唯一，极限为按度数加权的平均
+        self._consensus = np.abs(self.eigenvalues - 1.0) < 1e-10
+        self.consensus_value = float(np.sum(degree * x0) / np.sum(degree))
+
+    def _modes(self, weights):
+        weights = np.atleast_1d(np.asarray(weights, dtype=float))
+        return weights, weights[:, None] + (1.0 - weights[:, None]) * self.eigenvalues[None, :]
+
+    def slem(self, weights):
+        """每个 w 对应的第二大特征值模（非共识模态中 |μ| 的最大值）"""
+        _, mu = self._modes(weights)
+        return np.max(np.abs(mu[:, ~self._consensus]), axis=1, initial=0.0)
+
+    def _scaled(self, weights, t):
+        _, mu = self._modes(weights)
+        t = np.broadcast_to(np.asarray(t), (mu.shape[0],))
+        return mu ** t[:, None] * self._coefficients[None, :]
+
+    def states(self, weights, t):
+        """第 t 轮的状态（K × N，t 可为标量或每个 w 各自的轮数）"""
+        return self._scaled(weights, t) @ self._basis.T
+
+    def std(self, weights, t):
+        """第 t 轮的状态标准差（K 维），每个 w 的代价为 O(N²)，不构造状态本身"""
+        v = self._scaled(weights, t)
+        variance = np.einsum('kn,nm,km->k', v, self._centered_gram, v) / self.n_agents
+        return np.sqrt(np.maximum(variance, 0.0))
+
+    def iterations(self, weights, tolerance=1e-6, window_size=5, max_iterations=1000):
+        """
+        run_until_convergence 的收敛轮数（K 维整数数组）：所有 w 同时倍增再二分，找到标准差首次低于
+        tolerance 的轮数 t，再加上判定窗口 window_size - 1；上限内达不到（包括 μ = -1 的振荡）时为 max_iterations。
+        假设标准差随轮数单调下降（与 JumpPropagator.first_hit 相同）。
+        """
+        weights, _ = self._modes(weights)
+        k = len(weights)
+        result = np.full(k, max_iterations, dtype=np.int64)
+        initial = np.std(self.initial_states)
+        if initial < tolerance:
+            return np.full(k, min(window_size, max_iterations), dtype=np.int64)
+        low = np.zeros(k, dtype=np.int64)
+        high = np.ones(k, dtype=np.int64)
+        reached = self.std(weights, high) < tolerance
+        searching = ~reached
+        while np.any(searching):
+            low[searching] = high[searching]
+            high[searching] = np.minimum(2 * high[searching], max_iterations)
+            reached[searching] = self.std(weights[searching], high[searching]) < tolerance
+            searching &= ~reached & (low < max_iterations)
+        # 不变式：low 未达到，high 已达到
+        bisecting = reached & (high - low > 1)
+        while np.any(bisecting):
+            middle = (low + high) // 2
+            hit = self.std(weights[bisecting], middle[bisecting]) < tolerance
+            index = np.flatnonzero(bisecting)
+            high[index[hit]] = middle[index[hit]]
+            low[index[~hit]] = middle[index[~hit]]
+            bisecting = reached & (high - low > 1)
+        result[reached] = np.minimum(high[reached] + window_size - 1, max_iterations)
+        return result
+
+    def evaluate(self, weights, tolerance=1e-6, window_size=5, max_iterations=1000):
+        """
+        对一组 w 计算 (w, 收敛轮数, SLEM, 结束时的状态均值, 结束时的标准差)，返回数组字典；
+        consensus_value 为 |μ| < 1 时的共同极限（按度数加权的初始平均）。
+        """
+        weights, _ = self._modes(weights)
+        iterations = self.iterations(weights, tolerance, window_size, max_iterations)
+        final = self.states(weights, iterations)
+        return {
+            'weight': weights,
+            'iterations': iterations,
+            'slem': self.slem(weights),
+            'final_mean': final.mean(axis=1),
+            'final_std': final.std(axis=1),
+            'consensus_value': self.consensus_value,
+            'initial_mean': float(np.mean(self.initial_states)),
+        }
+
+
+def _merge(parts, size):
+    """把若干 (索引, evaluate 结果) 按原顺序拼接为一个结果字典"""
+    merged = {}
+    for index, result in parts:
+        for key, value in result.items():
+            if np.ndim(value) == 0:
+                value = np.full(len(index), value)
+            if key not in merged:
+                merged[key] = np.empty(size, dtype=np.asarray(value).dtype)
+            merged[key][index] = value
+    return merged
+
+
+def sweep_stubborn(sim, alphas, tolerance=1e-6, window_size=5, max_iterations=1000):
+    """Stubborn(α) 参数扫描：w = α（结果中的 weight 即 α）"""
+    alphas = np.asarray(alphas, dtype=float)
+    if np.any((alphas < 0) | (alphas > 1)):
+        raise ValueError("alpha 必须在 [0, 1] 范围内")
+    result = SelfWeightSweep(sim).evaluate(alphas, tolerance, window_size, max_iterations)
+    result['alpha'] = alphas
+    return result
+
+
+def sweep_susceptible(sim, betas, tolerance=1e-6, window_size=5, max_iterations=1000):
+    """
+    Susceptible(β) 参数扫描：β > 1 时 w = 1/β；β = 1 按 DeGroot 处理（对 A + I 另做一次分解）。
+    """
+    betas = np.asarray(betas, dtype=float)
+    if np.any(betas < 1.0):
+        raise ValueError("beta 必须 >= 1.0（按实验设计约束）")
+    parts = []
+    degroot = betas == 1.0
+    if np.any(~degroot):
+        index = np.flatnonzero(~degroot)
+        parts.append((index, SelfWeightSweep(sim).evaluate(
+            1.0 / betas[index], tolerance, window_size, max_iterations)))
+    if np.any(degroot):
+        index = np.flatnonzero(degroot)
+        parts.append((index, SelfWeightSweep(sim, include_self=True).evaluate(
+            np.zeros(len(index)), tolerance, window_size, max_iterations)))
+    result = _merge(parts, len(betas))
+    result['beta'] = betas
+    return result
@@ -0,0 +1,95 @@
+# src/recorders.py
+import numpy as np
+
+
+class Recorder:
+    """
+    在线记录器基类：模拟器每轮迭代后以当前状态调用 record，
+    只保存一个标量摘要，内存为 O(T) 而不是完整历史的 O(N·T)。
+    子类实现 compute(states) 并指定 name。
+    """
+    name = None
+
+    def __init__(self):
+        self.values = []
+        self.iterations = []
+        self.simulator = None
+
+    def bind(self, simulator):
+        """挂载到模拟器时调用（需要拓扑等信息的记录器可在此获取）"""
+        self.simulator = simulator
+
+    def compute(self, states):
+        raise NotImplementedError
+
+    def record(self, states, iteration):
+        self.values.append(float(self.compute(states)))
+        self.iterations.append(iteration)
+
+    def as_array(self):
+        return np.array(self.values)
+
+    def reset(self):
+        self.values = []
+        self.iterations = []
+
+
+class MeanRecorder(Recorder):
+    """状态均值"""
+    name = 'mean'
+
+    def compute(self, states):
+        return np.mean(states)
+
+
+class StdRecorder(Recorder):
+    """状态标准差"""
+    name = 'std'
+
+    def compute(self, states):
+        return np.std(states)
+
+
+class MinRecorder(Recorder):
+    """状态最小值"""
+    name = 'min'
+
+    def compute(self, states):
+        return np.min(states)
+
+
+class MaxRecorder(Recorder):
+    """状态最大值"""
+    name = 'max'
+
+    def compute(self, states):
+        return np.max(states)
+
+
+class RangeRecorder(Recorder):
+    """状态极差 max - min"""
+    name = 'range'
+
+    def compute(self, states):
+        return np.ptp(states)
+
+
+class DisagreementEnergyRecorder(Recorder):
+    """
+    分歧能量（拉普拉斯二次型）：
+    E(x) = x^T L x = Σ_{(i,j)∈E} (x_i - x_j)^2
+    利用模拟器的向量化引擎计算邻居和，不展开边表：E(x) = x^T (D x - A x) = Σ_i x_i (d_i x_i - S_i)。
+    由于 L·1 = 0，先减去均值再计算：接近共识时原始状态的各项约为 d·x² 而总和极小，直接相减只剩舍入误差
+    （甚至为负）；去均值后各项与能量同一量级。
+    """
+    name = 'disagreement'
+
+    def compute(self, states):
+        engine = self.simulator._get_batch_engine()
+        x = states - np.mean(states)
+        neighbor_sum = engine.neighbor_sums(x)[0]
+        return max(float(x @ (engine.degree * x - neighbor_sum)), 0.0)
+
+
+SUMMARY_RECORDERS = (MeanRecorder, StdRecorder, MinRecorder, MaxRecorder,
+                     RangeRecorder, DisagreementEnergyRecorder)
@@ -0,0 +1,182 @@
+# src/result_cache.py
+"""
+按内容寻址的模拟结果磁盘缓存：
+- 键为 完整模拟配置 + 代码版本（src/*.py 源码哈希）的稳定 SHA-256，任一参数或代码变化都会得到新键
+- 每个条目是一个 .npz 文件：迭代次数、最终标准差、共识值，以及可选的逐轮摘要轨迹
+- 超出容量上限时按最近使用时间（文件 mtime，命中时刷新）淘汰最旧的条目；总大小在写入时增量累计，
+  只有超限时才扫描目录，并一次淘汰到上限的 EVICT_FRACTION 以下，连续写入的均摊代价为 O(1)
+- 写入先写临时文件再原子替换，多个进程共享同一缓存目录也不会读到半个文件
+"""
+import glob
+import hashlib
+import json
+import os
+import tempfile
+
+import numpy as np
+
+DEFAULT_CACHE_DIR = os.path.join('results', 'cache')
+DEFAULT_MAX_BYTES = 512 * 1024 ** 2
+TRACE_PREFIX = 'trace_'
+EVICT_FRACTION = 0.9  # 超限时淘汰到上限的该比例，留出余量，避免此后每次写入都触发目录扫描
+
+_code_version = None
+
+
+def code_version():
+    """src 目录下全部源码的哈希（同一进程内只计算一次）"""
+    global _code_version
+    if _code_version is None:
+        digest = hashlib.sha256()
+        src_dir = os.path.dirname(os.path.abspath(__file__))
+        for path in sorted(glob.glob(os.path.join(src_dir, '*.py'))):
+            digest.update(os.path.basename(path).encode())
+            with open(path, 'rb') as f:
+                digest.update(f.read())
+        _code_version = digest.hexdigest()[:16]
+    return _code_version
+
+
+def _json_default(value):
+    """JSON 无法直接序列化的配置项：numpy 标量/数组、dtype、SeedSequence 等"""
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, type):
+        return f"{value.__module__}.{value.__qualname__}"
+    return repr(value)
+
+
+def config_key(config, version=None):
+    """
+    配置的稳定哈希：字典按键排序、元组与列表等价，附带代码版本。
+    参数:
+        config (dict): 模拟配置（如 sweep 的网格单元）。
+        version (str): 代码版本，默认为 code_version()。
+    """
+    payload = {'config': config, 'version': version if version is not None else code_version()}
+    text = json.dumps(payload, sort_keys=True, default=_json_default, ensure_ascii=False)
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+class ResultCache:
+    """
+    模拟结果缓存。
+    参数:
+        directory (str): 缓存目录。
+        max_bytes (int): 缓存总大小上限（字节），超出时按LRU淘汰；None 表示不限。
+        bypass (bool): 为 True 时不读缓存（仍写入新结果），用于强制重算。
+        version (str): 代码版本，默认为 src 源码哈希；修改非 src 代码导致结果变化时可手动指定。
+    """
+    def __init__(self, directory=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES, bypass=False,
+                 version=None):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.bypass = bypass
+        self.version = version
+        self.hits = 0
+        self.misses = 0
+        self._total = None  # 已知的缓存总大小（字节），首次写入时扫描一次，之后增量更新
+
+    def key(self, config):
+        return config_key(config, self.version)
+
+    def _path(self, key):
+        return os.path.join(self.directory, key[:2], key + '.npz')
+
+    def get(self, config):
+        """
+        查询缓存。
+        返回: 命中时为 dict（iterations / final_std / consensus_value / traces），否则为 None
+        """
+        if self.bypass:
+            self.misses += 1
+            return None
+        path = self._path(self.key(config))
+        try:
+            with np.load(path) as data:
+                result = {
+                    'iterations': int(data['iterations']),
+                    'final_std': float(data['final_std']),
+                    'consensus_value': float(data['consensus_value']),
+                    'traces': {name[len(TRACE_PREFIX):]: data[name]
+                               for name in data.files if name.startswith(TRACE_PREFIX)},
+                }
+        except (OSError, KeyError, ValueError):
+            self.misses += 1
+            return None
+        os.utime(path)  # 刷新最近使用时间
+        self.hits += 1
+        return result
+
+    def put(self, config, iterations, final_std, consensus_value, traces=None):
+        """写入一条结果（traces 为 {名称: 数组} 的逐轮摘要，可选）"""
+        path = self._path(self.key(config))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        arrays = {
+            'iterations': np.asarray(iterations),
+            'final_std': np.asarray(final_std, dtype=float),
+            'consensus_value': np.asarray(consensus_value, dtype=float),
+            'config': np.asarray(json.dumps(config, sort_keys=True, default=_json_default,
+                                            ensure_ascii=False)),
+        }
+        for name, values in (traces or {}).items():
+            arrays[TRACE_PREFIX + name] = np.asarray(values)
+
+        if self.max_bytes is not None and self._total is None:
+            self._total = self.size()
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                np.savez(f, **arrays)
+            written = os.path.getsize(tmp_path)
+            try:
+                replaced = os.path.getsize(path)
+            except OSError:
+                replaced = 0
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+        if self.max_bytes is not None:
+            self._total += written - replaced
+            # 其他进程写入同一目录时 _total 偏小，超限判断会滞后，但每次淘汰都会按实际扫描结果校正
+            if self._total > self.max_bytes:
+                self.evict(int(self.max_bytes * EVICT_FRACTION))
+
+    def entries(self):
+        """全部缓存条目 [(路径, 大小, 最近使用时间)]"""
+        entries = []
+        for path in glob.glob(os.path.join(self.directory, '*', '*.npz')):
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((path, stat.st_size, stat.st_mtime))
+        return entries
+
+    def size(self):
+        """缓存当前总大小（字节）"""
+        return sum(size for _, size, _ in self.entries())
+
+    def evict(self, max_bytes):
+        """按最近使用时间从旧到新删除条目，直到总大小不超过 max_bytes；返回删除的条目数"""
+        entries = sorted(self.entries(), key=lambda e: e[2])
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for path, size, _ in entries:
+            if total <= max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+        self._total = total
+        return removed
+
+    def clear(self):
+        """清空缓存"""
+        return self.evict(0)
@@ -0,0 +1,46 @@
+# src/rng.py
+"""
+随机数流管理：每个模拟器持有独立的 numpy.random.Generator，不再修改全局 np.random 状态。
+并行副本通过 SeedSequence.spawn 派生互不相关的随机数流，可在线程/进程间安全使用。
+"""
+import numpy as np
+
+
+def as_seed_sequence(seed=None):
+    """将 None / 整数 / SeedSequence 统一转换为 SeedSequence"""
+    if isinstance(seed, np.random.SeedSequence):
+        return seed
+    return np.random.SeedSequence(seed)
+
+
+def make_rng(seed=None):
+    """由种子（None / 整数 / SeedSequence / Generator）创建 Generator；传入 Generator 时原样返回"""
+    if isinstance(seed, np.random.Generator):
+        return seed
+    return np.random.default_rng(as_seed_sequence(seed))
+
+
+def initial_state_rng(seed):
+    """
+    初始状态的随机数源：整数种子使用 legacy np.random.RandomState(seed)，其 uniform 取值与旧版
+    np.random.seed(seed) 后调用 np.random.uniform 逐位相同（seed=42 复现引入 Generator 之前的初始状态）；
+    其余种子（None / SeedSequence / Generator）返回 make_rng(seed)。
+    """
+    if isinstance(seed, (int, np.integer)) and not isinstance(seed, bool):
+        return np.random.RandomState(seed)
+    return make_rng(seed)
+
+
+def spawn_seed_sequences(seed, n):
+    """从同一个种子派生 n 个相互独立的 SeedSequence（可传给子进程）"""
+    return as_seed_sequence(seed).spawn(n)
+
+
+def spawn_rngs(seed, n):
+    """从同一个种子派生 n 个相互独立的 Generator"""
+    return [np.random.default_rng(child) for child in spawn_seed_sequences(seed, n)]
+
+
+def derive_int_seed(seed_sequence):
+    """由 SeedSequence 生成一个32位整数种子（供只接受整数种子的库使用，如 networkx）"""
+    return int(seed_sequence.generate_state(1)[0])
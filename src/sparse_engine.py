@@ -0,0 +1,211 @@
+# src/sparse_engine.py
+# scipy.sparse 在构建CSR矩阵时才导入：循环引擎与隐式引擎不需要它
+import itertools
+
+import numpy as np
+
+
+def build_adjacency_csr(adj_list, n_agents):
+    """
+    将邻接表编译为CSR邻接矩阵（权重全为1）。
+    注意：每行保留 adj_list 中的邻居顺序（不排序），
+    这样稀疏乘法的累加顺序与逐个体循环中的 sum(neighbor_states) 完全一致。
+    """
+    degree = np.fromiter((len(adj_list.get(i, [])) for i in range(n_agents)),
+                         dtype=np.int64, count=n_agents)
+    indptr = np.zeros(n_agents + 1, dtype=np.int64)
+    np.cumsum(degree, out=indptr[1:])
+    indices = np.fromiter(
+        itertools.chain.from_iterable(adj_list.get(i, []) for i in range(n_agents)),
+        dtype=np.int64, count=int(indptr[-1])
+    )
+    import scipy.sparse as sp
+
+    data = np.ones(len(indices))
+    return sp.csr_matrix((data, indices, indptr), shape=(n_agents, n_agents))
+
+
+class BatchEngine:
+    """
+    向量化迭代引擎基类：
+    - 子类负责 neighbor_sums（如何得到每个个体的邻居状态和及平方和）
+    - 基类按策略的 batch_key 将智能体分组，每组调用一次策略的批量接口 compute_next_states
+    """
+    def __init__(self, n_agents, degree):
+        self.n_agents = n_agents
+        self.degree = degree
+        self._bound_strategies = None
+        self._uniform_strategy = None
+        self._groups = None
+        self._needs_sumsq = False
+
+    def bind(self, strategies):
+        """
+        绑定每个个体当前的策略对象并按 batch_key 分组。
+        策略对象未变化时直接复用上次的分组结果。
+        返回: 所有策略均实现批量接口时为 True，否则为 False
+        """
+        if self._bound_strategies is not None and len(strategies) == len(self._bound_strategies) \
+                and all(a is b for a, b in zip(strategies, self._bound_strategies)):
+            return True
+
+        supported = {}
+        members = {}
+        representative = {}
+        for i, strategy in enumerate(strategies):
+            type_key = type(strategy)
+            if type_key not in supported:
+                supported[type_key] = strategy.supports_batch()
+            if not supported[type_key]:
+                self._bound_strategies = None
+                return False
+            # 无邻居的个体保持原状态，不参与批量计算
+            if self.degree[i] == 0:
+                continue
+            key = strategy.batch_key()
+            if key not in members:
+                members[key] = []
+                representative[key] = strategy
+            members[key].append(i)
+
+        groups = []
+        for key, idx in members.items():
+            if len(idx) == self.n_agents:
+                idx = slice(None)  # 单组覆盖全部个体时避免花式索引的拷贝
+            else:
+                idx = np.array(idx)
+            groups.append((representative[key], idx))
+
+        self._bound_strategies = list(strategies)
+        self._uniform_strategy = None
+        self._groups = groups
+        self._needs_sumsq = any(strategy.needs_neighbor_sumsq for strategy, _ in groups)
+        return True
+
+    def bind_uniform(self, strategy):
+        """
+        所有个体共用同一个策略对象时的绑定：策略未变化时 O(1)，不需要逐个体的策略列表
+        （隐式拓扑的模拟器不构造 Agent 对象，见 ConsensusSimulator.agents）。
+        返回值与 bind 相同。
+        """
+        if self._uniform_strategy is strategy:
+            return True
+        if not strategy.supports_batch():
+            self._bound_strategies = None
+            self._uniform_strategy = None
+            return False
+        if np.any(self.degree == 0):
+            if not self.bind([strategy] * self.n_agents):
+                return False
+        else:
+            self._bound_strategies = None
+            self._groups = [(strategy, slice(None))]
+            self._needs_sumsq = strategy.needs_neighbor_sumsq
+        self._uniform_strategy = strategy
+        return True
+
+    @property
+    def groups(self):
+        """当前绑定的 (策略, 个体索引) 分组列表"""
+        return self._groups
+
+    def neighbor_sums(self, states, noise_std=0.0, with_sumsq=False, noise=None):
+        """
+        计算每个个体的邻居状态和，以及可选的邻居状态平方和（可叠加逐条边独立的通信噪声）。
+        noise 为抽取通信噪声的 NoiseSource（noise_std > 0 时必须提供）。
+        返回: (neighbor_sum, neighbor_sumsq)，未请求平方和时后者为 None
+        """
+        raise NotImplementedError
+
+    def sender_noise_sums(self, states, noise_std, with_sumsq, noise):
+        """
+        逐发送方噪声：每个个体广播同一个带噪声的状态 y = x + e，
+        邻居和即为对 y 的无噪声邻居和，每轮只需抽取 N（或 N×K）个噪声。
+        """
+        broadcast = states + noise.draw(states.shape, noise_std)
+        return self.neighbor_sums(broadcast, with_sumsq=with_sumsq)
+
+    def step(self, states, state_store, noise_std=0.0, step=0, columns=None, noise=None):
+        """
+        执行一轮向量化更新，返回新的状态数组（需先调用 bind）。
+        参数:
+            states: N维向量或 N×K 矩阵；矩阵形式下度数按行广播到每个副本
+            state_store: StrategyStateStore，保存策略的逐个体内部状态
+            columns: 批量副本模式下 states 对应的副本列（在 state_store 中的列号）
+            noise: 抽取通信噪声的 NoiseSource，其 model 决定逐边或逐发送方噪声
+        """
+        shape = (-1,) + (1,) * (states.ndim - 1)
+        degree = self.degree.reshape(shape)
+        if noise is not None and noise.model == 'sender' and np.any(np.asarray(noise_std) > 0):
+            neighbor_sum, neighbor_sumsq = self.sender_noise_sums(
+                states, noise_std, self._needs_sumsq, noise
+            )
+        else:
+            neighbor_sum, neighbor_sumsq = self.neighbor_sums(
+                states, noise_std=noise_std, with_sumsq=self._needs_sumsq, noise=noise
+            )
+
+        # 无邻居的个体保持原状态
+        new_states = states.copy()
+        for strategy, idx in self._groups:
+            if columns is None:
+                index = idx
+            elif isinstance(idx, slice):
+                index = (idx, columns)
+            else:
+                index = np.ix_(idx, columns)
+            new_states[idx] = strategy.compute_next_states(
+                states[idx],
+                neighbor_sum[idx],
+                neighbor_sumsq[idx] if strategy.needs_neighbor_sumsq else None,
+                degree[idx],
+                step,
+                state_store.view(index)
+            )
+        return new_states
+
+
+class SparseEngine(BatchEngine):
+    """
+    CSR稀疏矩阵迭代引擎：
+    - 构造时将 adj_list 一次性编译为CSR邻接矩阵（传入 CSRTopology 时直接复用其数组）
+    - 每轮迭代用一次稀疏矩阵-向量乘法得到所有个体的邻居状态和（及平方和）
+    """
+    def __init__(self, adj_list, n_agents, topology=None):
+        if topology is not None:
+            self.adjacency = topology.to_scipy()
+        else:
+            self.adjacency = build_adjacency_csr(adj_list, n_agents)
+        super().__init__(n_agents, np.diff(self.adjacency.indptr))
+        self._row_sum = None
+
+    def neighbor_sums(self, states, noise_std=0.0, with_sumsq=False, noise=None):
+        """
+        计算每个个体的邻居状态和，以及可选的邻居状态平方和（可叠加逐条边独立的通信噪声）。
+        states 可以是长度为N的向量，也可以是 N×K 矩阵（K个独立副本按列排列）；
+        矩阵形式下 noise_std 可为长度K的数组，所有副本的噪声一次性抽取。
+        返回: (neighbor_sum, neighbor_sumsq)，未请求平方和时后者为 None
+        """
+        adjacency = self.adjacency
+        if not np.any(np.asarray(noise_std) > 0):
+            neighbor_sumsq = adjacency @ (states * states) if with_sumsq else None
+            return adjacency @ states, neighbor_sumsq
+
+        # 整条边集一次性抽取噪声；按CSR行顺序抽取，与逐个体抽取的随机数序列一致
+        received = states[adjacency.indices]
+        received += noise.draw(received.shape, noise_std)
+        row_sum = self._edge_row_sum()
+        neighbor_sumsq = row_sum @ (received * received) if with_sumsq else None
+        return row_sum @ received, neighbor_sumsq
+
+    def _edge_row_sum(self):
+        """N×nnz 的行求和矩阵：将逐条边的取值按接收方累加（顺序与CSR行一致）"""
+        if self._row_sum is None:
+            import scipy.sparse as sp
+
+            adjacency = self.adjacency
+            self._row_sum = sp.csr_matrix(
+                (np.ones(adjacency.nnz), np.arange(adjacency.nnz), adjacency.indptr),
+                shape=(self.n_agents, adjacency.nnz)
+            )
+        return self._row_sum
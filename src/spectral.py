@@ -0,0 +1,499 @@
+# src/spectral.py
+"""
+线性策略的谱分析：
+DeGroot / Stubborn / Susceptible 的更新是固定的线性映射 x(t+1) = W x(t)，
+W = diag(a) + diag(b) A（a、b 由 strategy.linear_weights 给出，A 为邻接矩阵），每行和为 1。
+W 与对称矩阵 S = diag(a) + B^{1/2} A B^{1/2} 相似（S = B^{-1/2} W B^{1/2}），特征值均为实数，
+因此可以用对称特征值算法（小规模 eigvalsh，大规模 Lanczos/eigsh）求谱；
+环形 / 格子等循环矩阵直接由 FFT 得到完整的谱（见 circulant.py）。
+收敛速度由第二大特征值模 SLEM = max(λ_2, |λ_min|) 决定：std(x_t) ≈ C · SLEM^t。
+"""
+import math
+
+import numpy as np
+
+from .circulant import CirculantUpdate
+
+# 不超过该规模时直接对稠密矩阵求全部特征值
+DENSE_MAX_AGENTS = 2000
+
+
+class LinearUpdate:
+    """
+    模拟器当前策略与拓扑对应的线性更新映射 W = diag(a) + diag(b) A。
+    无邻居的个体 a = 1、b = 0（保持原状态）。
+    所有智能体的策略都必须实现 linear_weights，否则抛出 ValueError。
+    """
+    def __init__(self, sim):
+        engine = sim._get_batch_engine()
+        if not sim._bind_batch(engine):
+            raise ValueError("谱分析要求所有策略实现批量接口与 linear_weights")
+        n = sim.n_agents
+        self_weight = np.ones(n)
+        neighbor_weight = np.zeros(n)
+        for strategy, idx in engine.groups:
+            weights = strategy.linear_weights(engine.degree[idx].astype(float))
+            if weights is None:
+                raise ValueError(f"策略 {type(strategy).__name__} 不是线性策略，无法进行谱分析")
+            self_weight[idx], neighbor_weight[idx] = weights
+        self.engine = engine
+        self.n_agents = n
+        self.self_weight = self_weight
+        self.neighbor_weight = neighbor_weight
+
+    def _broadcast(self, weights, x):
+        return weights.reshape((-1,) + (1,) * (x.ndim - 1))
+
+    def apply(self, x):
+        """计算 W x（x 可为 N 维向量或 N×K 矩阵）"""
+        neighbor_sum, _ = self.engine.neighbor_sums(x)
+        return self._broadcast(self.self_weight, x) * x \
+            + self._broadcast(self.neighbor_weight, x) * neighbor_sum
+
+    def dense(self):
+        """稠密 W（只用于小规模）"""
+        return self.apply(np.eye(self.n_agents))
+
+    def sparse(self):
+        """稀疏 W（CSR）；隐式拓扑没有显式边表时返回 None"""
+        adjacency = getattr(self.engine, 'adjacency', None)
+        if adjacency is None:
+            return None
+        import scipy.sparse as sp
+
+        return (sp.diags(self.self_weight) + sp.diags(self.neighbor_weight) @ adjacency).tocsr()
+
+    def components(self):
+        """拓扑的连通分量：(分量数, 每个个体所属分量的编号)"""
+        adjacency = getattr(self.engine, 'adjacency', None)
+        if adjacency is None:
+            # 隐式拓扑（全连接 / 星型）总是连通的
+            return (1 if self.n_agents > 0 else 0), np.zeros(self.n_agents, dtype=np.int64)
+        from scipy.sparse.csgraph import connected_components
+
+        return connected_components(adjacency, directed=False)
+
+    def n_components(self):
+        """拓扑的连通分量数"""
+        return self.components()[0]
+
+    def mixes(self):
+        """每个个体都在与邻居混合（b > 0）且拓扑连通时，才可能达成全局共识"""
+        return self.n_agents > 1 and bool(np.all(self.neighbor_weight > 0)) and self.n_components() == 1
+
+    def symmetric_extremes(self, tol=1e-10):
+        """
+        返回 (λ_2, λ_min, 方法)：W 的第二大特征值与最小特征值（要求 mixes() 为 True）。
+        大规模时对 S 做 Lanczos：λ_2 取自剔除 Perron 向量 v_1 ∝ b^{-1/2} 后的最大特征值，
+        λ_min 取自 -S 的最大特征值。
+        """
+        sqrt_b = np.sqrt(self.neighbor_weight)
+        if self.n_agents <= DENSE_MAX_AGENTS:
+            S = self.dense() * sqrt_b[None, :] / sqrt_b[:, None]
+            eigenvalues = np.linalg.eigvalsh((S + S.T) / 2)
+            return eigenvalues[-2], eigenvalues[0], 'dense'
+
+        from scipy.sparse.linalg import LinearOperator, eigsh
+
+        n = self.n_agents
+        v1 = 1.0 / sqrt_b
+        v1 /= np.linalg.norm(v1)
+
+        def symmetric(x):
+            return self.apply(x * sqrt_b.reshape((-1,) + (1,) * (x.ndim - 1))) \
+                / sqrt_b.reshape((-1,) + (1,) * (x.ndim - 1))
+
+        def deflated(x):
+            x = np.asarray(x, dtype=float).reshape(n, -1)
+            x = x - np.outer(v1, v1 @ x)
+            return symmetric(x)
+
+        def negated(x):
+            return -symmetric(np.asarray(x, dtype=float).reshape(n, -1))
+
+        lambda_2 = eigsh(LinearOperator((n, n), matvec=deflated, matmat=deflated, dtype=float),
+                         k=1, which='LA', tol=tol, return_eigenvectors=False)[0]
+        lambda_min = -eigsh(LinearOperator((n, n), matvec=negated, matmat=negated, dtype=float),
+                            k=1, which='LA', tol=tol, return_eigenvectors=False)[0]
+        return lambda_2, lambda_min, 'lanczos'
+
+
+def spectral_bounds(update):
+    """(λ_2, λ_min, 方法)：循环矩阵用 FFT 精确求得，否则用 symmetric_extremes"""
+    circulant = CirculantUpdate.from_update(update)
+    if circulant is not None:
+        lambda_2, lambda_min = circulant.extremes()
+        return lambda_2, lambda_min, 'circulant'
+    return update.symmetric_extremes()
+
+
+class ConvergenceEstimate:
+    """
+    收敛预测结果。
+    属性:
+        slem: 第二大特征值模（<1 时收敛，越小越快）
+        lambda_2 / lambda_min: 第二大特征值与最小特征值
+        spectral_gap: 1 - slem
+        mixing_rate: 每轮误差的对数衰减率 -ln(slem)
+        relaxation_time: 误差衰减 e 倍所需轮数 1 / mixing_rate
+        predicted_iterations: 预计达到收敛判定所需的轮数（无法收敛时为 inf）
+        method: 'circulant' / 'dense' / 'lanczos' / 'disconnected'
+    """
+    def __init__(self, slem, lambda_2, lambda_min, predicted_iterations, method):
+        self.slem = slem
+        self.lambda_2 = lambda_2
+        self.lambda_min = lambda_min
+        self.spectral_gap = 1.0 - slem
+        self.mixing_rate = -math.log(slem) if 0 < slem < 1 else (math.inf if slem == 0 else 0.0)
+        self.relaxation_time = 1.0 / self.mixing_rate if self.mixing_rate > 0 else math.inf
+        self.predicted_iterations = predicted_iterations
+        self.method = method
+
+    def __repr__(self):
+        return (f"ConvergenceEstimate(slem={self.slem:.6g}, mixing_rate={self.mixing_rate:.4g}, "
+                f"predicted_iterations={self.predicted_iterations}, method='{self.method}')")
+
+
+def predict_iterations(slem, initial_std, tolerance, window_size=5):
+    """
+    由 SLEM 预测 run_until_convergence 的轮数：std(x_t) ≈ initial_std · slem^t，
+    首次低于 tolerance 后还需连续 window_size 轮低于阈值。
+    """
+    if initial_std < tolerance:
+        return window_size
+    if slem >= 1.0:
+        return math.inf
+    if slem <= 0.0:
+        return window_size
+    first = math.ceil(math.log(tolerance / initial_std) / math.log(slem))
+    return max(first, 1) + window_size - 1
+
+
+def estimate_convergence(sim, tolerance=1e-6, window_size=5, set_max_iterations=False,
+                         safety_factor=2.0):
+    """
+    预测线性策略从当前状态出发的收敛轮数与混合速率，无需运行模拟。
+    参数:
+        sim (ConsensusSimulator): 模拟器（所有智能体使用 DeGroot / Stubborn / Susceptible 等线性策略）。
+        tolerance (float): 收敛阈值（与 run_until_convergence 相同）。
+        window_size (int): 收敛判定窗口。
+        set_max_iterations (bool): 为 True 时把 sim.max_iterations 设为
+            ceil(safety_factor × 预测轮数)（无法收敛时不修改）。
+    返回:
+        ConvergenceEstimate。预测基于无噪声动力学；常数因子 C 取初始标准差，
+        对度数差异很大的图可能有若干轮的偏差。
+    """
+    update = LinearUpdate(sim)
+    initial_std = float(np.std(sim._current_states()))
+
+    if not update.mixes():
+        return ConvergenceEstimate(1.0, 1.0, float(np.min(update.self_weight)), math.inf,
+                                   'disconnected')
+    lambda_2, lambda_min, method = spectral_bounds(update)
+
+    slem = float(max(abs(lambda_2), abs(lambda_min)))
+    predicted = predict_iterations(slem, initial_std, tolerance, window_size)
+    if set_max_iterations and predicted != math.inf:
+        sim.max_iterations = int(math.ceil(safety_factor * predicted))
+    return ConvergenceEstimate(slem, float(lambda_2), float(lambda_min), predicted, method)
+
+
+class JumpPropagator:
+    """
+    跳跃推进：直接计算 W^t x，不逐轮迭代。
+    - 'eigen'：对称化 S = B^{-1/2} W B^{1/2} = Q Λ Q^T 做一次特征分解（O(N³)），
+      之后任意 t 只需 O(N²)：W^t x = B^{1/2} Q Λ^t Q^T B^{-1/2} x（要求所有 b > 0）
+    - 'squaring'：稠密 W 的重复平方，缓存 W^(2^k)，W^t x 只需 O(log t) 次矩阵-向量乘法
+    - 'circulant'：循环矩阵（环形 / 格子且权重一致）用一对 FFT，任意 t 都是 O(N log N)
+    - 'matvec'：大规模时逐轮 t 次稀疏乘法（无预处理，退化为普通迭代但不经过智能体对象）
+    'auto' 优先选 'circulant'；否则在 N <= DENSE_MAX_AGENTS 时选 'eigen'
+    （有个体不与邻居混合时选 'squaring'），再否则选 'matvec'。
+    """
+    def __init__(self, update, method='auto'):
+        circulant = None
+        if method in ('auto', 'circulant'):
+            circulant = CirculantUpdate.from_update(update)
+            if circulant is None and method == 'circulant':
+                raise ValueError("当前拓扑与策略的更新矩阵不是循环矩阵")
+        if method == 'auto':
+            if circulant is not None:
+                method = 'circulant'
+            elif update.n_agents > DENSE_MAX_AGENTS:
+                method = 'matvec'
+            elif np.all(update.neighbor_weight > 0):
+                method = 'eigen'
+            else:
+                method = 'squaring'
+        if method not in ('circulant', 'eigen', 'squaring', 'matvec'):
+            raise ValueError(f"未知的跳跃推进方法: {method}")
+        if method == 'eigen' and not np.all(update.neighbor_weight > 0):
+            raise ValueError("存在不与邻居混合的个体（b = 0），W 无法对称化，请使用 'squaring'")
+        self.update = update
+        self.method = method
+        self._powers = None
+        self.circulant = circulant
+        if method == 'eigen':
+            sqrt_b = np.sqrt(update.neighbor_weight)
+            S = update.dense() * sqrt_b[None, :] / sqrt_b[:, None]
+            self._eigenvalues, self._eigenvectors = np.linalg.eigh((S + S.T) / 2)
+            self._sqrt_b = sqrt_b
+        elif method == 'squaring':
+            self._powers = [update.dense()]
+
+    def _power(self, k):
+        """W^(2^k)（按需平方并缓存）"""
+        while len(self._powers) <= k:
+            last = self._powers[-1]
+            self._powers.append(last @ last)
+        return self._powers[k]
+
+    def apply(self, x, t):
+        """计算 W^t x（x 可为 N 维向量或 N×K 矩阵）"""
+        t = int(t)
+        if t < 0:
+            raise ValueError("t 必须 >= 0")
+        x = np.asarray(x, dtype=float)
+        if t == 0:
+            return x.copy()
+        if self.method == 'circulant':
+            return self.circulant.apply(x, t)
+        if self.method == 'eigen':
+            shape = (-1,) + (1,) * (x.ndim - 1)
+            sqrt_b = self._sqrt_b.reshape(shape)
+            coefficients = self._eigenvectors.T @ (x / sqrt_b)
+            coefficients *= (self._eigenvalues ** t).reshape(shape)
+            return sqrt_b * (self._eigenvectors @ coefficients)
+        if self.method == 'squaring':
+            k = 0
+            while t:
+                if t & 1:
+                    x = self._power(k) @ x
+                t >>= 1
+                k += 1
+            return x
+        for _ in range(t):
+            x = self.update.apply(x)
+        return x
+
+    def first_hit(self, x, tolerance, max_iterations):
+        """
+        最小的 t（1 <= t <= max_iterations）使 std(W^t x) < tolerance；达不到时返回 None。
+        circulant / eigen / squaring 先倍增再二分，只需 O(log T) 次推进；matvec 逐轮检查。
+        假设标准差随 t 单调下降（线性共识动力学的一般情形）。
+        """
+        if self.method == 'matvec':
+            for t in range(1, max_iterations + 1):
+                x = self.update.apply(x)
+                if np.std(x) < tolerance:
+                    return t
+            return None
+
+        def reached(t):
+            return np.std(self.apply(x, t)) < tolerance
+
+        low, high = 0, 1
+        while not reached(high):
+            if high >= max_iterations:
+                return None
+            low, high = high, min(2 * high, max_iterations)
+        # 不变式：low 未达到，high 已达到
+        while high - low > 1:
+            middle = (low + high) // 2
+            if reached(middle):
+                high = middle
+            else:
+                low = middle
+        return high
+
+
+class SteadyState:
+    """
+    线性更新的不动点 x* = W x*。
+    属性:
+        states: 各个体的稳态值
+        anchored: 锚定个体（b = 0，不与邻居混合，状态保持不变）的布尔掩码
+        component_values: 无锚定个体的连通分量 → 共识值（Perron 加权平均）
+        consensus_value: 全局达成共识时的共识值，否则为 None
+        initial_mean: 当前状态的算术平均（与 consensus_value 对比可看出度数加权带来的偏移）
+        residual: 残差 max |W x* - x*|
+        method: 'perron' / 'harmonic' / 'perron+harmonic'
+    """
+    def __init__(self, states, anchored, component_values, initial_mean, residual, method):
+        self.states = states
+        self.anchored = anchored
+        self.component_values = component_values
+        values = list(component_values.values())
+        self.consensus_value = values[0] if len(values) == 1 and not anchored.any() else None
+        self.initial_mean = initial_mean
+        self.residual = residual
+        self.method = method
+
+    def __repr__(self):
+        return (f"SteadyState(consensus_value={self.consensus_value}, initial_mean={self.initial_mean:.6g}, "
+                f"anchored={int(self.anchored.sum())}, residual={self.residual:.3g}, method='{self.method}')")
+
+
+def solve_steady_state(sim, tol=1e-10):
+    """
+    直接求线性策略的稳态，无需迭代：
+    - 没有锚定个体的连通分量收敛到共识值 π^T x0。W 行随机时左 Perron 向量 π_i ∝ 1/b_i
+      （π_j a_j + Σ_{i~j} π_i b_i = π_j 在 a_j + b_j d_j = 1 时成立），因此是 O(N) 的加权平均；
+      DeGroot 为按 (度数 + 1) 加权、Stubborn / Susceptible(β>1) 为按度数加权的平均。
+    - 含锚定个体（b = 0，如 alpha = 1 的 Stubborn、孤立个体）的分量，自由个体满足调和方程
+      (I - W_FF) x_F = W_FA x_A，用稀疏直接法求解（隐式拓扑且规模较大时用 GMRES）。
+    稳态是不动点；W 有特征值 -1（如二部图上自身权重为 0）时迭代本身会振荡而不收敛。
+    返回:
+        SteadyState；残差超过 tol 时仍返回结果，调用方可自行检查 residual。
+    """
+    update = LinearUpdate(sim)
+    a, b = update.self_weight, update.neighbor_weight
+    x0 = sim._current_states()
+    n = update.n_agents
+    anchored = b == 0
+    if np.any(np.abs(a + b * update.engine.degree - 1) > 1e-9):
+        raise ValueError("更新矩阵不是行随机的，稳态求解只适用于 a + b·度数 = 1 的线性策略")
+
+    n_components, labels = update.components()
+    anchored_components = np.zeros(n_components, dtype=bool)
+    anchored_components[labels[anchored]] = True
+
+    states = x0.copy()
+    component_values = {}
+    methods = []
+    # 无锚定分量：Perron 加权平均
+    mixing = ~anchored_components[labels]
+    if mixing.any():
+        weights = np.zeros(n)
+        weights[mixing] = 1.0 / b[mixing]
+        totals = np.bincount(labels, weights=weights * x0, minlength=n_components)
+        norms = np.bincount(labels, weights=weights, minlength=n_components)
+        for component in np.flatnonzero(~anchored_components):
+            component_values[int(component)] = float(totals[component] / norms[component])
+        states[mixing] = totals[labels[mixing]] / norms[labels[mixing]]
+        methods.append('perron')
+
+    # 含锚定个体的分量：调和延拓
+    free = ~anchored & anchored_components[labels]
+    if free.any():
+        boundary = np.where(free, 0.0, x0)
+        rhs = update.apply(boundary)[free]
+        matrix = update.sparse()
+        if matrix is not None or n <= DENSE_MAX_AGENTS:
+            import scipy.sparse as sp
+            from scipy.sparse.linalg import spsolve
+
+            W = matrix if matrix is not None else sp.csr_matrix(update.dense())
+            W_ff = W[free][:, free]
+            states[free] = spsolve((sp.identity(W_ff.shape[0], format='csc') - W_ff).tocsc(), rhs)
+        else:
+            from scipy.sparse.linalg import LinearOperator, gmres
+
+            free_index = np.flatnonzero(free)
+
+            def operator(y):
+                full = np.zeros(n)
+                full[free_index] = np.ravel(y)
+                return np.ravel(y) - update.apply(full)[free_index]
+
+            size = len(free_index)
+            solution, info = gmres(LinearOperator((size, size), matvec=operator, dtype=float), rhs,
+                                   x0=x0[free], rtol=tol)
+            states[free] = solution
+        methods.append('harmonic')
+
+    residual = float(np.max(np.abs(update.apply(states) - states))) if n else 0.0
+    return SteadyState(states, anchored, component_values, float(np.mean(x0)) if n else 0.0,
+                       residual, '+'.join(methods))
+
+
+class ChebyshevAccelerator:
+    """
+    Chebyshev 半迭代加速：W 的非共识特征值位于 [lower, upper] 内时，把区间仿射映射到 [-1, 1]，
+    M = (2W - (upper + lower) I) / (upper - lower)，共识模态 1 映射为 μ = (2 - upper - lower) / (upper - lower) > 1，
+    取 y_t = T_t(M) x_0 / T_t(μ)（T_t 为 Chebyshev 多项式），三项递推为
+        ρ_1 = 1/μ,  ρ_{t+1} = 1 / (2μ - ρ_t)
+        y_1 = M y_0 / μ,  y_{t+1} = 2ρ_{t+1} M y_t - ρ_{t+1} ρ_t y_{t-1}
+    每轮只需一次基础更新 W y_t。π^T M = μ π^T，因此 Perron 加权平均（共识值）与基础策略相同。
+    每轮误差衰减率约为 1 / (μ + sqrt(μ² - 1))，而基础迭代为 SLEM。
+    区间按 margin（相对宽度）外扩、且宽度不小于 MIN_WIDTH，以容忍特征值估计误差并避免退化区间放大舍入误差；
+    有通信噪声时加速会放大噪声，稳态波动大于基础迭代。
+    """
+    MIN_WIDTH = 1e-3
+
+    def __init__(self, lower, upper, margin=1e-3):
+        if not upper < 1.0:
+            raise ValueError("λ_2 必须小于 1（拓扑不连通或存在不混合的个体时无法加速）")
+        self.slem = max(abs(lower), abs(upper))
+        pad = max(margin * (upper - lower), (self.MIN_WIDTH - (upper - lower)) / 2, 0.0)
+        # 外扩不越过共识模态 1
+        self.lower = lower - pad
+        self.upper = min(upper + pad, (1.0 + upper) / 2)
+        self.mu = (2.0 - self.upper - self.lower) / (self.upper - self.lower)
+        self.reset()
+
+    @classmethod
+    def from_update(cls, update, margin=1e-3):
+        """由拓扑与策略自动估计谱区间（见 spectral_bounds）"""
+        if not update.mixes():
+            raise ValueError("拓扑不连通或存在不与邻居混合的个体，无法加速")
+        lambda_2, lambda_min, _ = spectral_bounds(update)
+        return cls(lambda_min, lambda_2, margin=margin)
+
+    def reset(self):
+        """清除递推状态（外部修改了状态时调用）"""
+        self._previous = None
+        self._ratio = None
+
+    @property
+    def rate(self):
+        """每轮误差衰减率的渐近值"""
+        return 1.0 / (self.mu + math.sqrt(self.mu * self.mu - 1.0))
+
+    def step(self, states, base_states):
+        """由当前状态 y_t 与基础更新结果 W y_t 计算加速后的 y_{t+1}"""
+        shifted = (2.0 * base_states - (self.upper + self.lower) * states) / (self.upper - self.lower)
+        if self._previous is None:
+            ratio = 1.0 / self.mu
+            new_states = shifted * ratio
+        else:
+            ratio = 1.0 / (2.0 * self.mu - self._ratio)
+            new_states = 2.0 * ratio * shifted - (ratio * self._ratio) * self._previous
+        self._previous = states
+        self._ratio = ratio
+        return new_states
+
+
+def _iterations_to_converge(step, x, tolerance, window_size, max_iterations):
+    """按 run_until_convergence 的判定（连续 window_size 轮标准差低于阈值）计数"""
+    below = 0
+    for iteration in range(1, max_iterations + 1):
+        x = step(x)
+        below = below + 1 if np.std(x) < tolerance else 0
+        if below == window_size:
+            return iteration
+    return None
+
+
+def compare_acceleration(sim, tolerance=1e-6, window_size=5, max_iterations=100000, margin=1e-3):
+    """
+    从模拟器当前状态出发，分别运行基础迭代与 Chebyshev 加速迭代（无噪声，不修改模拟器），
+    返回两者的收敛轮数、谱预测轮数与加速比，用于比较不同拓扑上的加速效果。
+    达不到收敛时对应轮数为 None。
+    """
+    update = LinearUpdate(sim)
+    accelerator = ChebyshevAccelerator.from_update(update, margin=margin)
+    x0 = sim._current_states()
+    initial_std = float(np.std(x0))
+    base = _iterations_to_converge(update.apply, x0, tolerance, window_size, max_iterations)
+
+    def accelerated_step(x):
+        return accelerator.step(x, update.apply(x))
+
+    accelerated = _iterations_to_converge(accelerated_step, x0, tolerance, window_size, max_iterations)
+    return {
+        'base': base,
+        'accelerated': accelerated,
+        'predicted_base': predict_iterations(accelerator.slem, initial_std, tolerance, window_size),
+        'predicted_accelerated': predict_iterations(accelerator.rate, initial_std, tolerance, window_size),
+        'speedup': base / accelerated if base and accelerated else None,
+    }
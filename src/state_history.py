@@ -0,0 +1,88 @@
+# src/state_history.py
+import numpy as np
+
+# 首次预分配的缓冲区上限（字节），超出部分按几何倍数增长
+_MAX_INITIAL_BYTES = 64 * 1024 * 1024
+
+
+class StateHistory:
+    """
+    预分配的状态历史缓冲区（行 = 记录点，列 = 智能体）：
+    - 缓冲区按 capacity_hint 预分配，写满后容量翻倍增长
+    - record_every=k 时只记录迭代轮数为 k 的倍数的状态（另可强制记录，如最终状态）
+    - 支持 float32 存储以减半内存
+    - as_array() 以 O(1) 返回已记录部分的视图（不拷贝）
+    兼容原先 list 的常用用法：len()、下标读写（history[0] = ...）、history[-1]、迭代。
+    """
+    def __init__(self, n_agents, record_every=1, dtype=np.float64, capacity_hint=1):
+        if record_every < 1:
+            raise ValueError("record_every 必须 >= 1")
+        self.n_agents = n_agents
+        self.record_every = record_every
+        self.dtype = np.dtype(dtype)
+        row_bytes = max(n_agents * self.dtype.itemsize, 1)
+        capacity = max(1, min(capacity_hint, _MAX_INITIAL_BYTES // row_bytes))
+        self._buffer = np.empty((capacity, n_agents), dtype=self.dtype)
+        self._iterations = np.empty(capacity, dtype=np.int64)
+        self._length = 0
+
+    def _grow(self):
+        capacity = 2 * len(self._buffer)
+        buffer = np.empty((capacity, self.n_agents), dtype=self.dtype)
+        buffer[:self._length] = self._buffer[:self._length]
+        iterations = np.empty(capacity, dtype=np.int64)
+        iterations[:self._length] = self._iterations[:self._length]
+        self._buffer, self._iterations = buffer, iterations
+
+    def record(self, states, iteration, force=False):
+        """
+        记录第 iteration 轮的状态；不在记录步长上且未强制时忽略。
+        同一轮重复记录时覆盖最后一行。
+        返回: 是否写入
+        """
+        if not force and iteration % self.record_every != 0:
+            return False
+        if self._length > 0 and self._iterations[self._length - 1] == iteration:
+            self._buffer[self._length - 1] = states
+            return True
+        if self._length == len(self._buffer):
+            self._grow()
+        self._buffer[self._length] = states
+        self._iterations[self._length] = iteration
+        self._length += 1
+        return True
+
+    def append(self, states):
+        """按 list.append 的方式追加一行（记为上一记录点之后的下一个记录步长）"""
+        iteration = self._iterations[self._length - 1] + self.record_every if self._length else 0
+        self.record(states, iteration, force=True)
+
+    def as_array(self):
+        """已记录部分的二维视图 (记录点数 × 智能体数)，不拷贝"""
+        return self._buffer[:self._length]
+
+    @property
+    def iterations(self):
+        """每个记录点对应的迭代轮数"""
+        return self._iterations[:self._length]
+
+    def clear(self):
+        self._length = 0
+
+    def __len__(self):
+        return self._length
+
+    def __getitem__(self, index):
+        return self.as_array()[index]
+
+    def __setitem__(self, index, states):
+        self.as_array()[index] = states
+
+    def __iter__(self):
+        return iter(self.as_array())
+
+    def __array__(self, dtype=None, copy=None):
+        array = self.as_array()
+        if dtype is not None and np.dtype(dtype) != array.dtype:
+            return array.astype(dtype)
+        return array.copy() if copy else array
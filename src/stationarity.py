@@ -0,0 +1,159 @@
+# src/stationarity.py
+"""
+噪声运行的平稳性检测：
+有通信噪声时标准差不会降到 tolerance 以下，分歧过程最终进入平稳分布（噪声底，见 noise_floor.py）。
+对每轮的方差序列 v_t = std_t²：
+1. MSER 截断：把序列分成大小为 m 的批，选择截断点 d 使剩余批均值的 Σ(ȳ - mean)² / (k - d)² 最小，
+   截断点落在后半段说明仍处于过渡期；
+2. 批均值置信区间：截断后的序列按批大小 ≈ batch_factor × 积分自相关时间 τ 分批，使批均值近似独立正态，
+   均值的置信区间半宽为 t_{1-α/2, 批数-1} · s / sqrt(批数)；批数不足 n_batches 时继续运行；
+噪声底取 sqrt(均值)，其置信区间由方差区间取平方根得到；该区间的半宽不超过噪声底的 rel_precision 倍时判定为平稳。
+"""
+import math
+
+import numpy as np
+
+
+def mser_truncation(series, batch_size=5):
+    """
+    MSER-m 截断点（以原序列的下标计）。只在前一半批中搜索；返回值为 None 表示最优截断点
+    落在搜索边界上（序列仍在过渡期）。
+    """
+    series = np.asarray(series, dtype=float)
+    k = len(series) // batch_size
+    if k < 4:
+        return None
+    batches = series[len(series) - k * batch_size:].reshape(k, batch_size).mean(axis=1)
+    offset = len(series) - k * batch_size
+    # 后缀和：截断前 d 个批后剩余 k - d 个批的均值与离差平方和
+    suffix_sum = np.cumsum(batches[::-1])[::-1]
+    suffix_sumsq = np.cumsum((batches * batches)[::-1])[::-1]
+    remaining = np.arange(k, 0, -1, dtype=float)
+    half = k // 2
+    deviation = suffix_sumsq[:half] - suffix_sum[:half] ** 2 / remaining[:half]
+    statistic = deviation / remaining[:half] ** 2
+    best = int(np.argmin(statistic))
+    if best >= half - 1:
+        return None
+    return offset + best * batch_size
+
+
+def autocorrelation_time(series):
+    """
+    积分自相关时间 τ = 1 + 2 Σ_k ρ_k（Geyer 初始正序列估计：相邻两阶自协方差之和为正时累加）。
+    独立序列 τ = 1；τ 越大，同样长度的序列包含的独立信息越少。
+    """
+    series = np.asarray(series, dtype=float)
+    n = len(series)
+    if n < 4:
+        return math.inf
+    centered = series - series.mean()
+    spectrum = np.fft.rfft(centered, n=2 * n)
+    autocovariance = np.fft.irfft(spectrum * np.conj(spectrum))[:n] / n
+    if autocovariance[0] <= 0:
+        return 1.0
+    pairs = autocovariance[:n - n % 2].reshape(-1, 2).sum(axis=1)
+    negative = np.flatnonzero(pairs <= 0)
+    end = negative[0] if len(negative) else len(pairs)
+    tau = (2.0 * pairs[:end].sum() - autocovariance[0]) / autocovariance[0]
+    return max(tau, 1.0)
+
+
+def batch_means_interval(series, n_batches=20, confidence=0.95, batch_size=None):
+    """
+    批均值法：返回 (均值, 置信区间半宽)。batch_size 为 None 时把序列均分为 n_batches 批，
+    否则使用给定的批大小（批数由序列长度决定）。不足两批时半宽为 inf。
+    """
+    series = np.asarray(series, dtype=float)
+    if batch_size is not None:
+        n_batches = len(series) // batch_size
+    size = len(series) // n_batches if n_batches > 0 else 0
+    if size < 1 or n_batches < 2:
+        return float(np.mean(series)) if len(series) else math.nan, math.inf
+    batches = series[len(series) - size * n_batches:].reshape(n_batches, size).mean(axis=1)
+    from scipy.stats import t
+
+    half_width = t.ppf(0.5 + confidence / 2, n_batches - 1) * batches.std(ddof=1) / math.sqrt(n_batches)
+    return float(batches.mean()), float(half_width)
+
+
+class NoiseFloorEstimate:
+    """
+    平稳段估计的噪声底。
+    属性:
+        std: sqrt(平稳段方差均值)
+        ci_low / ci_high: std 的置信区间（由方差均值的区间取平方根）
+        variance / half_width: 平稳段方差均值及其置信区间半宽
+        truncation: MSER 截断点（平稳段起始轮数，相对本次运行）
+        samples: 平稳段样本数
+    """
+    def __init__(self, variance, half_width, truncation, samples, confidence):
+        self.variance = variance
+        self.half_width = half_width
+        self.std = math.sqrt(max(variance, 0.0))
+        self.ci_low = math.sqrt(max(variance - half_width, 0.0))
+        self.ci_high = math.sqrt(max(variance + half_width, 0.0))
+        self.truncation = truncation
+        self.samples = samples
+        self.confidence = confidence
+
+    def __repr__(self):
+        return (f"NoiseFloorEstimate(std={self.std:.6g}, {self.confidence:.0%} CI=[{self.ci_low:.6g}, "
+                f"{self.ci_high:.6g}], truncation={self.truncation}, samples={self.samples})")
+
+
+class StationarityDetector:
+    """
+    逐轮接收标准差，每 check_every 轮检验一次平稳性。
+    参数:
+        check_every (int): 检验间隔（轮）。
+        min_samples (int): 截断后至少需要的样本数。
+        n_batches (int): 批均值法至少需要的批数。
+        batch_factor (float): 批大小相对积分自相关时间的倍数。
+        confidence (float): 置信水平。
+        rel_precision (float): 噪声底置信区间半宽相对噪声底的上限。
+        batch_size (int): MSER 的批大小。
+    """
+    def __init__(self, check_every=50, min_samples=200, n_batches=10, batch_factor=3.0, confidence=0.95,
+                 rel_precision=0.05, batch_size=5):
+        self.check_every = check_every
+        self.min_samples = min_samples
+        self.n_batches = n_batches
+        self.batch_factor = batch_factor
+        self.confidence = confidence
+        self.rel_precision = rel_precision
+        self.batch_size = batch_size
+        self.reset()
+
+    def reset(self):
+        self._values = np.empty(1024)
+        self._length = 0
+        self.estimate = None
+
+    def push(self, std_dev):
+        """记录一轮的标准差；到达检验点且判定平稳时返回 NoiseFloorEstimate，否则返回 None"""
+        if self._length == len(self._values):
+            self._values = np.concatenate([self._values, np.empty(len(self._values))])
+        self._values[self._length] = std_dev * std_dev
+        self._length += 1
+        if self._length % self.check_every != 0:
+            return None
+        return self.check()
+
+    def check(self):
+        """对已记录的序列做 MSER 截断与批均值检验"""
+        series = self._values[:self._length]
+        truncation = mser_truncation(series, self.batch_size)
+        if truncation is None or len(series) - truncation < self.min_samples:
+            return None
+        stationary = series[truncation:]
+        size = max(1, int(math.ceil(self.batch_factor * autocorrelation_time(stationary))))
+        if len(stationary) // size < self.n_batches:
+            return None
+        mean, half_width = batch_means_interval(stationary, confidence=self.confidence, batch_size=size)
+        estimate = NoiseFloorEstimate(mean, half_width, truncation, len(series) - truncation,
+                                      self.confidence)
+        if not (estimate.ci_high - estimate.ci_low) / 2 <= self.rel_precision * estimate.std:
+            return None
+        self.estimate = estimate
+        return estimate
@@ -4,6 +4,9 @@ import numpy as np
 
 class ConsensusStrategy(ABC):
     """共识策略抽象基类"""
+    # 批量更新是否需要邻居状态平方和（用于邻居方差）
+    needs_neighbor_sumsq = False
+
     def __init__(self, **kwargs):
         pass
 
@@ -11,6 +14,41 @@ class ConsensusStrategy(ABC):
     def compute_next_state(self, self_state, neighbor_states):
         pass
 
+    def compute_next_states(self, states, neighbor_sum, neighbor_sumsq, degree, step, state):
+        """
+        批量版本：对一组智能体（均至少有一个邻居）同时计算下一状态。
+        参数:
+            states: 自身状态数组（N维向量或 N×K 矩阵）
+            neighbor_sum: 邻居状态和
+            neighbor_sumsq: 邻居状态平方和（仅当 needs_neighbor_sumsq 为 True 时提供，否则为 None）
+            degree: 邻居数量，可与 states 广播
+            step: 模拟器当前迭代轮数（从0开始）
+            state: StrategyStateView，按智能体保存的内部状态（步数、EMA、历史等）
+        未实现批量版本的策略由模拟器回退到逐个体的 compute_next_state。
+        """
+        raise NotImplementedError
+
+    def supports_batch(self):
+        """是否实现了批量版本 compute_next_states"""
+        return type(self).compute_next_states is not ConsensusStrategy.compute_next_states
+
+    def batch_key(self):
+        """
+        批量分组键：键相同的策略对象可合并为一次批量调用。
+        默认按对象本身分组；内置策略按 (类型, 参数) 分组（内部状态保存在
+        StrategyStateStore 中而非策略对象上），这样每个智能体各自持有的同参数
+        策略对象也能合并计算。
+        """
+        return self
+
+    def linear_weights(self, degree):
+        """
+        线性策略的更新权重：x_i(t+1) = a_i x_i(t) + b_i Σ_{j∈N(i)} x_j(t)。
+        参数 degree 为邻居数量数组（均 >= 1），返回 (a, b) 两个数组；
+        非线性策略返回 None（谱分析、跳跃推进等只适用于线性策略）。
+        """
+        return None
+
 class DeGrootStrategy(ConsensusStrategy):
     """标准DeGroot共识策略：取自身与所有邻居状态的平均值"""
     def compute_next_state(self, self_state, neighbor_states):
@@ -19,6 +57,16 @@ class DeGrootStrategy(ConsensusStrategy):
         total = self_state + sum(neighbor_states)
         return total / (1 + len(neighbor_states))
 
+    def compute_next_states(self, states, neighbor_sum, neighbor_sumsq, degree, step, state):
+        return (states + neighbor_sum) / (1 + degree)
+
+    def batch_key(self):
+        return (DeGrootStrategy,)
+
+    def linear_weights(self, degree):
+        weight = 1.0 / (1 + degree)
+        return weight, weight
+
 class StubbornStrategy(ConsensusStrategy):
     """固执型策略：保留部分自身状态，混合邻居平均
     x_i(t+1) = alpha * x_i(t) + (1 - alpha) * avg(neighbors)
@@ -36,6 +84,16 @@ class StubbornStrategy(ConsensusStrategy):
         neighbor_avg = sum(neighbor_states) / len(neighbor_states)
         return self.alpha * self_state + (1 - self.alpha) * neighbor_avg
 
+    def compute_next_states(self, states, neighbor_sum, neighbor_sumsq, degree, step, state):
+        neighbor_avg = neighbor_sum / degree
+        return self.alpha * states + (1 - self.alpha) * neighbor_avg
+
+    def batch_key(self):
+        return (StubbornStrategy, self.alpha)
+
+    def linear_weights(self, degree):
+        return np.full(np.shape(degree), self.alpha), (1 - self.alpha) / degree
+
 class SusceptibleStrategy(ConsensusStrategy):
     """易受影响型策略（保留原始公式框架）
     公式：x_i(t+1) = (1/β) * x_i(t) + ((β - 1)/β) * avg(neighbors)
@@ -64,6 +122,23 @@ class SusceptibleStrategy(ConsensusStrategy):
         neighbor_weight = (self.beta - 1.0) / self.beta
         return self_weight * self_state + neighbor_weight * neighbor_avg
 
+    def compute_next_states(self, states, neighbor_sum, neighbor_sumsq, degree, step, state):
+        if self.beta == 1.0:
+            return (states + neighbor_sum) / (1 + degree)
+        neighbor_avg = neighbor_sum / degree
+        self_weight = 1.0 / self.beta
+        neighbor_weight = (self.beta - 1.0) / self.beta
+        return self_weight * states + neighbor_weight * neighbor_avg
+
+    def batch_key(self):
+        return (SusceptibleStrategy, self.beta)
+
+    def linear_weights(self, degree):
+        if self.beta == 1.0:
+            weight = 1.0 / (1 + degree)
+            return weight, weight
+        return np.full(np.shape(degree), 1.0 / self.beta), (self.beta - 1.0) / self.beta / degree
+
 class AdaptiveSusceptibleStrategy(ConsensusStrategy):
     """
     自适应易受影响策略：
@@ -74,6 +149,8 @@ class AdaptiveSusceptibleStrategy(ConsensusStrategy):
     beta_t = beta_max * exp(-k * var(neighbors))
     x_i(t+1) = (1 - beta_t) * x_i(t) + beta_t * avg(neighbors)
     """
+    needs_neighbor_sumsq = True
+
     def __init__(self, beta_max=0.9, k=5.0):
         super().__init__()
         if beta_max <= 0 or beta_max > 1.0:
@@ -91,6 +168,16 @@ class AdaptiveSusceptibleStrategy(ConsensusStrategy):
         beta_t = self.beta_max * np.exp(-self.k * var_neighbor)
         return (1 - beta_t) * self_state + beta_t * mean_neighbor
 
+    def compute_next_states(self, states, neighbor_sum, neighbor_sumsq, degree, step, state):
+        mean_neighbor = neighbor_sum / degree
+        # 总体方差 E[x^2] - E[x]^2，截断舍入误差造成的负值
+        var_neighbor = np.maximum(neighbor_sumsq / degree - mean_neighbor ** 2, 0.0)
+        beta_t = self.beta_max * np.exp(-self.k * var_neighbor)
+        return (1 - beta_t) * states + beta_t * mean_neighbor
+
+    def batch_key(self):
+        return (AdaptiveSusceptibleStrategy, self.beta_max, self.k)
+
 # 在 src/strategies.py 末尾添加
 class DiffAdaptiveStrategy(ConsensusStrategy):
     """
@@ -110,6 +197,15 @@ class DiffAdaptiveStrategy(ConsensusStrategy):
         beta_t = self.beta_max * np.exp(-self.k * diff)
         return (1 - beta_t) * self_state + beta_t * neighbor_avg
 
+    def compute_next_states(self, states, neighbor_sum, neighbor_sumsq, degree, step, state):
+        neighbor_avg = neighbor_sum / degree
+        diff = np.abs(states - neighbor_avg)
+        beta_t = self.beta_max * np.exp(-self.k * diff)
+        return (1 - beta_t) * states + beta_t * neighbor_avg
+
+    def batch_key(self):
+        return (DiffAdaptiveStrategy, self.beta_max, self.k)
+
 class RobustDiffAdaptiveStrategy(ConsensusStrategy):
     """
     鲁棒增强版自适应策略：
@@ -138,6 +234,20 @@ class RobustDiffAdaptiveStrategy(ConsensusStrategy):
         self.step_count += 1
         return (1 - beta_t) * self_state + beta_t * neighbor_avg
 
+    def compute_next_states(self, states, neighbor_sum, neighbor_sumsq, degree, step, state):
+        # 批量版本中步数按智能体独立计数，保存在状态存储中
+        step_count = state.get('step_count', fill=0, dtype=np.int64)
+        neighbor_avg = neighbor_sum / degree
+        diff = np.abs(states - neighbor_avg)
+        beta_dynamic = self.beta_max * np.exp(-self.k * diff)
+        trust_factor = 1 - np.exp(-step_count / self.tau)
+        beta_t = beta_dynamic * trust_factor
+        state.set('step_count', step_count + 1)
+        return (1 - beta_t) * states + beta_t * neighbor_avg
+
+    def batch_key(self):
+        return (RobustDiffAdaptiveStrategy, self.beta_max, self.k, self.tau)
+
 
 # ========== 新增：抗噪增强策略 ==========
 class NoiseResilientStrategy(ConsensusStrategy):
@@ -147,6 +257,8 @@ class NoiseResilientStrategy(ConsensusStrategy):
     - 设置信任门限：仅当差异显著时才更新
     - 结合信任衰减机制
     """
+    HISTORY_SIZE = 100  # 历史记录的最大长度
+
     def __init__(self, beta_max=0.6, k=0.05, tau=30, smoothing_window=3, trust_threshold=5.0):
         self.beta_max = beta_max
         self.k = k
@@ -183,12 +295,32 @@ class NoiseResilientStrategy(ConsensusStrategy):
 
         # 更新历史（用于未来可能的扩展）
         self.history.append(next_state)
-        if len(self.history) > 100:
+        if len(self.history) > self.HISTORY_SIZE:
             self.history.pop(0)
 
         self.step_count += 1
         return next_state
 
+    def compute_next_states(self, states, neighbor_sum, neighbor_sumsq, degree, step, state):
+        step_count = state.get('step_count', fill=0, dtype=np.int64)
+        smoothed_neighbor_avg = neighbor_sum / degree
+        diff = np.abs(states - smoothed_neighbor_avg)
+        beta_dynamic = self.beta_max * np.exp(-self.k * diff)
+        trust_factor = 1 - np.exp(-step_count / self.tau)
+        beta_t = beta_dynamic * trust_factor
+        # 信任门限：差异小于门限视为噪声，保持不变
+        updated = (1 - beta_t) * states + beta_t * smoothed_neighbor_avg
+        next_states = np.where(diff < self.trust_threshold, states, updated)
+
+        # 历史保存在有界环形缓冲区中（与逐个体版本一样最多保留最近 HISTORY_SIZE 个值）
+        state.push('history', next_states, capacity=self.HISTORY_SIZE)
+        state.set('step_count', step_count + 1)
+        return next_states
+
+    def batch_key(self):
+        return (NoiseResilientStrategy, self.beta_max, self.k, self.tau,
+                self.smoothing_window, self.trust_threshold)
+
 #应对鲁棒性的第三次测试方案策略
 class LowPassFilterStrategy(ConsensusStrategy):
     """
@@ -228,4 +360,25 @@ class LowPassFilterStrategy(ConsensusStrategy):
         next_state = (1 - beta_t) * self_state + beta_t * self.smoothed_neighbor_avg
 
         self.step_count += 1
-        return next_state
\ No newline at end of file
+        return next_state
+
+    def compute_next_states(self, states, neighbor_sum, neighbor_sumsq, degree, step, state):
+        step_count = state.get('step_count', fill=0, dtype=np.int64)
+        current_avg = neighbor_sum / degree
+
+        # 逐个体EMA：尚未初始化（NaN）的个体直接取当前邻居均值
+        smoothed = state.get('smoothed_neighbor_avg', fill=np.nan)
+        smoothed = np.where(np.isnan(smoothed), current_avg,
+                            (1 - self.alpha) * smoothed + self.alpha * current_avg)
+
+        diff = np.abs(states - smoothed)
+        beta_dynamic = self.beta_max * np.exp(-self.k * diff)
+        trust_factor = 1 - np.exp(-step_count / self.tau)
+        beta_t = beta_dynamic * trust_factor
+
+        state.set('smoothed_neighbor_avg', smoothed)
+        state.set('step_count', step_count + 1)
+        return (1 - beta_t) * states + beta_t * smoothed
+
+    def batch_key(self):
+        return (LowPassFilterStrategy, self.alpha, self.beta_max, self.k, self.tau)
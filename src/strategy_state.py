@@ -0,0 +1,89 @@
+# src/strategy_state.py
+import numpy as np
+
+
+class StrategyStateStore:
+    """
+    策略内部状态的结构数组存储：
+    - 每个字段是一个按智能体编号索引的 NumPy 数组（步数计数器、EMA累加器、环形缓冲区等）
+    - 形状为 (N,) 或 (N, K)（批量副本模式下每个副本独立保存状态）
+    - 字段在首次访问时按给定初值创建，因此策略无需预先声明
+    注意：仅批量接口 compute_next_states 使用该存储；逐个体的 compute_next_state
+    仍沿用策略对象上的属性。
+    """
+    def __init__(self, shape):
+        self.shape = tuple(shape)
+        self._arrays = {}
+        self._flat_positions = None
+
+    def __contains__(self, name):
+        return name in self._arrays
+
+    def array(self, name, fill=0.0, dtype=float, capacity=None):
+        """获取（必要时创建）字段数组；capacity 不为 None 时在末尾追加一维作为环形缓冲区"""
+        if name not in self._arrays:
+            shape = self.shape if capacity is None else self.shape + (capacity,)
+            self._arrays[name] = np.full(shape, fill, dtype=dtype)
+        return self._arrays[name]
+
+    def reset(self):
+        """清空全部字段（下次访问时按初值重建）"""
+        self._arrays.clear()
+
+    def flat_positions(self):
+        """前导维度的扁平化位置表（供环形缓冲区按行寻址，惰性创建）"""
+        if self._flat_positions is None:
+            self._flat_positions = np.arange(int(np.prod(self.shape))).reshape(self.shape)
+        return self._flat_positions
+
+    def view(self, index):
+        """返回绑定到一组智能体（及副本列）的状态视图"""
+        return StrategyStateView(self, index)
+
+
+class StrategyStateView:
+    """
+    状态存储在一组智能体上的视图，供策略批量接口读写。
+    index 为作用于前导维度的索引（切片、整数数组，或批量副本模式下的 np.ix_ 元组）。
+    """
+    def __init__(self, store, index):
+        self._store = store
+        self._index = index
+
+    def get(self, name, fill=0.0, dtype=float):
+        """读取字段在该组上的取值（返回拷贝）"""
+        return np.array(self._store.array(name, fill=fill, dtype=dtype)[self._index])
+
+    def set(self, name, values):
+        """写回字段在该组上的取值"""
+        self._store.array(name)[self._index] = values
+
+    def _flat_positions(self):
+        """该组在前导维度上的扁平化位置"""
+        return self._store.flat_positions()[self._index].ravel()
+
+    def push(self, name, values, capacity):
+        """向逐个体的环形缓冲区写入一个值，写满后覆盖最旧的值"""
+        buffer = self._store.array(name, fill=np.nan, capacity=capacity).reshape(-1, capacity)
+        head = self._store.array(name + '_head', fill=0, dtype=np.int64).reshape(-1)
+        count = self._store.array(name + '_count', fill=0, dtype=np.int64).reshape(-1)
+        rows = self._flat_positions()
+        buffer[rows, head[rows]] = np.ravel(values)
+        head[rows] = (head[rows] + 1) % capacity
+        count[rows] = np.minimum(count[rows] + 1, capacity)
+
+    def ring(self, name, capacity):
+        """
+        按时间顺序（旧→新）读取环形缓冲区。
+        返回: (values, count)，values 的最后一维长度为 capacity，未写入的位置为 NaN
+        """
+        buffer = self._store.array(name, fill=np.nan, capacity=capacity).reshape(-1, capacity)
+        head = self._store.array(name + '_head', fill=0, dtype=np.int64).reshape(-1)
+        count = self._store.array(name + '_count', fill=0, dtype=np.int64).reshape(-1)
+        rows = self._flat_positions()
+        start = np.where(count[rows] < capacity, 0, head[rows])
+        order = (start[:, None] + np.arange(capacity)) % capacity
+        values = np.take_along_axis(buffer[rows], order, axis=1)
+        values[np.arange(capacity) >= count[rows][:, None]] = np.nan
+        shape = np.shape(self._store.array(name + '_count')[self._index])
+        return values.reshape(shape + (capacity,)), count[rows].reshape(shape)
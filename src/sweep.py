@@ -0,0 +1,216 @@
+# src/sweep.py
+"""
+并行参数扫描：
+- SweepGrid 声明式描述 规模 × 拓扑 × 策略 × 噪声 × 种子 的参数网格
+- run_sweep 将网格单元分块分发到常驻进程池，结果汇总为 DataFrame
+  （列与 results/consensus_precision_results.csv 一致：N, Topology, Strategy, Iterations,
+  Final_Std, Consensus_Value；扫描噪声或多个种子时追加 Noise_Std / Seed 列）
+传入 ResultCache 时只计算缓存中不存在的单元（重新绘图或扩展网格时无需重算已有结果）。
+相同种子、相同规模的单元初始状态相同（初始状态与拓扑使用不同的派生随机数流），跨拓扑可比。
+"""
+import atexit
+import itertools
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .consensus_simulator import ConsensusSimulator
+
+RESULT_COLUMNS = ['N', 'Topology', 'Strategy', 'Iterations', 'Final_Std', 'Consensus_Value']
+
+
+class SweepGrid:
+    """
+    参数网格。
+    参数:
+        sizes (list): 智能体数量列表。
+        topologies (list): 拓扑类型列表。
+        strategies (list): (策略名, 标签, 参数字典) 三元组列表，与实验脚本的写法一致。
+        noise_stds (list): 通信噪声标准差列表。
+        seeds (list): 随机种子列表（每个种子一次独立运行）。
+        initial_state_range (tuple): 初始状态范围。
+        max_iterations (int): 最大迭代次数。
+        tolerance (float): 收敛阈值。
+        simulator_kwargs (dict): 其余传给 ConsensusSimulator 的参数（如 engine、noise_model）。
+    """
+    def __init__(self, sizes, topologies, strategies, noise_stds=(0.0,), seeds=(42,),
+                 initial_state_range=(0, 100), max_iterations=2000, tolerance=1e-8,
+                 simulator_kwargs=None):
+        self.sizes = list(sizes)
+        self.topologies = list(topologies)
+        self.strategies = [tuple(s) for s in strategies]
+        self.noise_stds = list(noise_stds)
+        self.seeds = list(seeds)
+        self.initial_state_range = tuple(initial_state_range)
+        self.max_iterations = max_iterations
+        self.tolerance = tolerance
+        self.simulator_kwargs = dict(simulator_kwargs or {})
+
+    def cells(self):
+        """按 N → 拓扑 → 策略 → 噪声 → 种子 的顺序展开为单元字典列表（可被子进程 pickle）"""
+        cells = []
+        for n, topology, (strategy, label, params), noise_std, seed in itertools.product(
+                self.sizes, self.topologies, self.strategies, self.noise_stds, self.seeds):
+            cells.append({
+                'n_agents': n,
+                'topology': topology,
+                'strategy': strategy,
+                'label': label,
+                'strategy_params': dict(params),
+                'noise_std': noise_std,
+                'seed': seed,
+                'initial_state_range': self.initial_state_range,
+                'max_iterations': self.max_iterations,
+                'tolerance': self.tolerance,
+                'simulator_kwargs': self.simulator_kwargs,
+            })
+        return cells
+
+    def __len__(self):
+        return (len(self.sizes) * len(self.topologies) * len(self.strategies)
+                * len(self.noise_stds) * len(self.seeds))
+
+
+def run_cell(cell):
+    """运行单个网格单元，返回一行结果；出错时记录 Iterations=-1 与 NaN（与实验脚本一致）"""
+    row = {'N': cell['n_agents'], 'Topology': cell['topology'], 'Strategy': cell['label'],
+           'Noise_Std': cell['noise_std'], 'Seed': cell['seed']}
+    try:
+        kwargs = {'history': 'none'}
+        kwargs.update(cell['simulator_kwargs'])
+        sim = ConsensusSimulator(
+            n_agents=cell['n_agents'],
+            topology=cell['topology'],
+            initial_state_range=cell['initial_state_range'],
+            strategy=cell['strategy'],
+            strategy_params=cell['strategy_params'],
+            max_iterations=cell['max_iterations'],
+            verbose=False,
+            seed=cell['seed'],
+            **kwargs
+        )
+        iterations = sim.run_until_convergence(
+            max_iterations=cell['max_iterations'],
+            tolerance=cell['tolerance'],
+            noise_std=cell['noise_std'],
+            verbose=False
+        )
+        final_states = sim.get_state_history()[-1]
+        row.update(Iterations=iterations, Final_Std=float(np.std(final_states)),
+                   Consensus_Value=float(np.mean(final_states)))
+        if sim.recorders:
+            row['traces'] = sim.get_summary()
+    except Exception as e:
+        row.update(Iterations=-1, Final_Std=np.nan, Consensus_Value=np.nan, Error=str(e))
+    return row
+
+
+# ===== 常驻进程池：多次扫描复用同一组工作进程，避免反复启动解释器与导入依赖 =====
+_executor = None
+_executor_workers = None
+
+
+def get_executor(max_workers=None):
+    """获取（必要时创建）常驻进程池；worker 数变化时重建"""
+    global _executor, _executor_workers
+    max_workers = max_workers or os.cpu_count() or 1
+    if _executor is None or _executor_workers != max_workers:
+        shutdown_executor()
+        _executor = ProcessPoolExecutor(max_workers=max_workers)
+        _executor_workers = max_workers
+    return _executor
+
+
+def shutdown_executor():
+    """关闭常驻进程池"""
+    global _executor, _executor_workers
+    if _executor is not None:
+        _executor.shutdown()
+        _executor = None
+        _executor_workers = None
+
+
+atexit.register(shutdown_executor)
+
+
+def cell_config(cell):
+    """单元中决定模拟结果的部分（去掉仅用于展示的标签），作为结果缓存的键"""
+    return {name: value for name, value in cell.items() if name != 'label'}
+
+
+def cacheable(cell):
+    """
+    单元结果能否缓存：seed 为 None（每次从系统熵取种子）或传入 Generator（键中只有其 repr）时，
+    同一配置每次运行的结果不同，不读也不写缓存。
+    """
+    seed = cell.get('seed')
+    return seed is not None and not isinstance(seed, np.random.Generator)
+
+
+def _cached_row(cell, cached):
+    return {'N': cell['n_agents'], 'Topology': cell['topology'], 'Strategy': cell['label'],
+            'Noise_Std': cell['noise_std'], 'Seed': cell['seed'],
+            'Iterations': cached['iterations'], 'Final_Std': cached['final_std'],
+            'Consensus_Value': cached['consensus_value']}
+
+
+def run_sweep(grid, max_workers=None, chunksize=None, progress=False, cache=None):
+    """
+    并行运行参数网格。
+    参数:
+        grid (SweepGrid): 参数网格（也可直接传入单元字典列表）。
+        max_workers (int): 工作进程数，默认为CPU核数；为1时在当前进程串行运行。
+        chunksize (int): 每次分发给工作进程的单元数，默认约为 单元数 / (4 × 进程数)，
+            在调度开销与负载均衡之间折中。
+        progress (bool): 是否逐单元打印结果。
+        cache (ResultCache): 结果缓存；命中的单元不再计算，新结果（出错的单元除外）写入缓存。
+            种子不确定的单元（见 cacheable）总是重新计算，也不写入缓存。
+    返回:
+        pd.DataFrame: 每个单元一行，顺序与 grid.cells() 一致。
+    """
+    cells = grid.cells() if isinstance(grid, SweepGrid) else list(grid)
+    max_workers = max_workers or os.cpu_count() or 1
+
+    results = [None] * len(cells)
+    pending = []
+    for i, cell in enumerate(cells):
+        cached = cache.get(cell_config(cell)) if cache is not None and cacheable(cell) else None
+        if cached is not None:
+            results[i] = _cached_row(cell, cached)
+        else:
+            pending.append(i)
+
+    todo = [cells[i] for i in pending]
+    if max_workers == 1 or len(todo) <= 1:
+        rows = map(run_cell, todo)
+    else:
+        if chunksize is None:
+            chunksize = max(1, math.ceil(len(todo) / (4 * max_workers)))
+        rows = get_executor(max_workers).map(run_cell, todo, chunksize=chunksize)
+
+    for i, row in zip(pending, rows):
+        traces = row.pop('traces', None)
+        if cache is not None and row['Iterations'] != -1 and cacheable(cells[i]):
+            cache.put(cell_config(cells[i]), row['Iterations'], row['Final_Std'],
+                      row['Consensus_Value'], traces=traces)
+        if progress:
+            print(f"  N={row['N']:<5} {row['Topology']:12} | {row['Strategy']:15} → "
+                  f"轮数={row['Iterations']}, 最终标准差={row['Final_Std']:.2e}")
+        results[i] = row
+    return _to_dataframe(results)
+
+
+def _to_dataframe(rows):
+    """汇总为 DataFrame；只有在噪声或种子实际变化、或有单元出错时才保留对应的附加列"""
+    import pandas as pd
+
+    df = pd.DataFrame(rows)
+    columns = list(RESULT_COLUMNS)
+    for extra in ('Noise_Std', 'Seed'):
+        if extra in df and df[extra].nunique() > 1:
+            columns.append(extra)
+    if 'Error' in df and df['Error'].notna().any():
+        columns.append('Error')
+    return df.reindex(columns=columns)
@@ -0,0 +1,129 @@
+# src/topology_cache.py
+"""
+拓扑缓存：相同 (类型, 规模, 参数, 种子) 的拓扑只生成一次。
+- 进程内 LRU：最近使用的 max_entries 个拓扑直接复用（数组只读共享）
+- 可选磁盘层：每个拓扑保存为一个目录下的 indptr.npy / indices.npy，
+  加载时以 mmap_mode='r' 内存映射，不把整张大图读入内存；多个进程可共享同一份文件
+确定性拓扑（complete / ring / lattice / star）与种子无关，键中不含种子，不同种子的运行共享同一条目。
+"""
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from collections import OrderedDict
+
+import numpy as np
+
+from .network_generator import CSRTopology, generate_csr
+
+RANDOM_TOPOLOGIES = ('small_world', 'erdos_renyi', 'barabasi_albert')
+CACHE_DIR_ENV = 'CONSENSUS_TOPOLOGY_CACHE'
+
+
+def topology_key(topology_type, n_agents, seed=None, **params):
+    """拓扑的缓存键：确定性拓扑忽略种子"""
+    if topology_type not in RANDOM_TOPOLOGIES:
+        seed = None
+    return (topology_type, int(n_agents), seed, tuple(sorted(params.items())))
+
+
+class TopologyCache:
+    """
+    拓扑缓存。
+    参数:
+        directory (str): 磁盘缓存目录；None 表示只使用进程内缓存。
+        max_entries (int): 进程内 LRU 的容量（拓扑个数）。
+    """
+    def __init__(self, directory=None, max_entries=64):
+        self.directory = directory
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def get(self, topology_type, n_agents, seed=None, **params):
+        """返回 CSRTopology；依次查询进程内缓存、磁盘缓存，都未命中时生成并写入两级缓存"""
+        key = topology_key(topology_type, n_agents, seed, **params)
+        topology = self._entries.get(key)
+        if topology is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return topology
+
+        topology = self._load(key)
+        if topology is not None:
+            self.disk_hits += 1
+        else:
+            self.misses += 1
+            topology = generate_csr(topology_type, n_agents, seed=seed, **params)
+            topology.indptr.setflags(write=False)
+            topology.indices.setflags(write=False)
+            self._save(key, topology)
+
+        self._entries[key] = topology
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return topology
+
+    def _path(self, key):
+        text = json.dumps(key, sort_keys=True, default=repr)
+        name = f"{key[0]}_{key[1]}_" + hashlib.sha256(text.encode()).hexdigest()[:16]
+        return os.path.join(self.directory, name)
+
+    def _load(self, key):
+        if self.directory is None:
+            return None
+        path = self._path(key)
+        try:
+            indptr = np.load(os.path.join(path, 'indptr.npy'), mmap_mode='r')
+            indices = np.load(os.path.join(path, 'indices.npy'), mmap_mode='r')
+        except (OSError, ValueError):
+            return None
+        return CSRTopology(indptr, indices, key[1])
+
+    def _save(self, key, topology):
+        if self.directory is None:
+            return
+        path = self._path(key)
+        if os.path.isdir(path):
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        # 先写入临时目录再整体改名，并发写入同一拓扑时只有一个生效
+        tmp_path = tempfile.mkdtemp(dir=self.directory, prefix='.tmp_')
+        try:
+            np.save(os.path.join(tmp_path, 'indptr.npy'), topology.indptr)
+            np.save(os.path.join(tmp_path, 'indices.npy'), topology.indices)
+            os.rename(tmp_path, path)
+        except OSError:
+            shutil.rmtree(tmp_path, ignore_errors=True)
+
+    def clear(self, disk=False):
+        """清空进程内缓存；disk=True 时同时删除磁盘缓存目录"""
+        self._entries.clear()
+        if disk and self.directory is not None:
+            shutil.rmtree(self.directory, ignore_errors=True)
+
+
+_default_cache = None
+
+
+def get_topology_cache():
+    """进程级默认拓扑缓存（环境变量 CONSENSUS_TOPOLOGY_CACHE 指定磁盘目录时启用磁盘层）"""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = TopologyCache(directory=os.environ.get(CACHE_DIR_ENV) or None)
+    return _default_cache
+
+
+def configure_topology_cache(directory=None, max_entries=64):
+    """替换进程级默认拓扑缓存（如在扫描脚本开头启用磁盘缓存）"""
+    global _default_cache
+    _default_cache = TopologyCache(directory=directory, max_entries=max_entries)
+    return _default_cache
+
+
+def get_topology(topology_type, n_agents, seed=None, **params):
+    """通过默认缓存获取拓扑"""
+    return get_topology_cache().get(topology_type, n_agents, seed=seed, **params)
@@ -0,0 +1,6 @@
+# tests/conftest.py
+import os
+import sys
+
+# 测试以 src.xxx 的形式导入，与 benchmarks/ 脚本一致
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
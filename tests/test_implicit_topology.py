@@ -0,0 +1,31 @@
+# tests/test_implicit_topology.py
+"""隐式拓扑不构造 Agent 对象：结果须与显式邻接表一致，访问 agents 后仍可像原来一样修改状态"""
+import numpy as np
+import pytest
+
+from src.consensus_simulator import ConsensusSimulator
+
+
+@pytest.mark.parametrize('topology', ['complete', 'star'])
+def test_implicit_matches_sparse_without_agents(topology):
+    kwargs = dict(topology=topology, initial_state_range=(0, 100), verbose=False, seed=7,
+                  strategy='stubborn', strategy_params={'alpha': 0.3})
+    implicit = ConsensusSimulator(40, engine='implicit', **kwargs)
+    sparse = ConsensusSimulator(40, engine='sparse', **kwargs)
+    for _ in range(30):
+        implicit.run_iteration()
+        sparse.run_iteration()
+    assert implicit._agents is None
+    np.testing.assert_allclose(implicit._current_states(), sparse._current_states(), rtol=1e-12)
+
+
+def test_agents_materialize_on_access():
+    sim = ConsensusSimulator(20, topology='complete', verbose=False, engine='implicit', seed=1)
+    sim.run_iteration()
+    states = sim._current_states()
+    agents = sim.agents
+    assert [agent.state for agent in agents.values()] == states.tolist()
+    assert len(agents[0].neighbors) == 19
+    agents[3].state = 1e6
+    sim.run_iteration()
+    assert sim._current_states().max() > states.max()
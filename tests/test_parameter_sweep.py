@@ -0,0 +1,40 @@
+# tests/test_parameter_sweep.py
+"""参数扫描的收敛轮数必须与逐轮模拟一致（紧容差下检验接近共识时的数值精度）"""
+import pytest
+
+from src.consensus_simulator import ConsensusSimulator
+from src.parameter_sweep import sweep_stubborn, sweep_susceptible
+from src.strategies import StubbornStrategy, SusceptibleStrategy
+
+N_AGENTS = 60
+MAX_ITERATIONS = 5000
+
+
+def make_simulator(initial_state_range):
+    return ConsensusSimulator(N_AGENTS, topology='small_world', initial_state_range=initial_state_range,
+                              verbose=False, history='none')
+
+
+def simulated_iterations(initial_state_range, tolerance, strategy):
+    sim = make_simulator(initial_state_range)
+    for agent in sim.agents.values():
+        agent.strategy = strategy
+    return sim.run_until_convergence(max_iterations=MAX_ITERATIONS, tolerance=tolerance, verbose=False)
+
+
+@pytest.mark.parametrize('initial_state_range, tolerance', [((0, 100), 1e-6), ((0, 1), 1e-8), ((0, 100), 1e-9)])
+def test_stubborn_iterations_match_simulation(initial_state_range, tolerance):
+    alphas = [0.0, 0.5, 0.9]
+    result = sweep_stubborn(make_simulator(initial_state_range), alphas, tolerance=tolerance,
+                            max_iterations=MAX_ITERATIONS)
+    expected = [simulated_iterations(initial_state_range, tolerance, StubbornStrategy(alpha)) for alpha in alphas]
+    assert list(result['iterations']) == expected
+
+
+@pytest.mark.parametrize('initial_state_range, tolerance', [((0, 100), 1e-6), ((0, 1), 1e-8)])
+def test_susceptible_iterations_match_simulation(initial_state_range, tolerance):
+    betas = [1.0, 2.0]
+    result = sweep_susceptible(make_simulator(initial_state_range), betas, tolerance=tolerance,
+                               max_iterations=MAX_ITERATIONS)
+    expected = [simulated_iterations(initial_state_range, tolerance, SusceptibleStrategy(beta)) for beta in betas]
+    assert list(result['iterations']) == expected
@@ -0,0 +1,32 @@
+# tests/test_recorders.py
+"""在线记录器：分歧能量在接近共识时仍须非负，并与逐边计算的拉普拉斯二次型一致"""
+import numpy as np
+import pytest
+
+from src.consensus_simulator import ConsensusSimulator
+from src.recorders import DisagreementEnergyRecorder
+
+
+class EnergyCheck(DisagreementEnergyRecorder):
+    """同时按边表直接计算 Σ_{(i,j)∈E} (x_i - x_j)^2 作为对照"""
+    name = 'disagreement_check'
+
+    def record(self, states, iteration):
+        super().record(states, iteration)
+        topology = self.simulator._csr
+        rows = np.repeat(np.arange(topology.n_agents), np.diff(topology.indptr))
+        self.direct = getattr(self, 'direct', [])
+        self.direct.append(np.sum((states[rows] - states[topology.indices]) ** 2) / 2)
+
+
+@pytest.mark.parametrize('topology', ['ring', 'small_world'])
+def test_disagreement_energy_nonnegative_until_convergence(topology):
+    sim = ConsensusSimulator(50, topology=topology, initial_state_range=(0, 100), verbose=False,
+                             engine='sparse', history='none')
+    recorder = sim.add_recorder(EnergyCheck())
+    sim.run_until_convergence(max_iterations=20000, tolerance=1e-8, verbose=False)
+    energy = recorder.as_array()
+    direct = np.array(recorder.direct)
+    assert np.std(sim._current_states()) < 1e-8
+    assert np.all(energy >= 0)
+    np.testing.assert_allclose(energy, direct, rtol=1e-6, atol=1e-30)